@@ -0,0 +1,95 @@
+# Airspeed velocity (asv) suite, mirrors the run_benchmark command of flora_tools
+import time
+
+import flora_tools.sim.sim_benchmark as sim_benchmark
+from flora_tools.sim.sim_logging import set_sim_log_level
+
+
+def setup():
+    # Runs before every benchmark of this module
+    set_sim_log_level(sim_benchmark.BENCHMARK_LOG_LEVEL)
+
+
+class CLI:
+    def setup(self):
+        self.run, _ = sim_benchmark.setup_cli_startup()
+
+    def time_startup(self):
+        self.run()
+
+
+class RadioMath:
+    def setup(self):
+        self.run, _ = sim_benchmark.setup_message_toa()
+
+    def time_get_message_toa(self):
+        self.run()
+
+
+class GloriaFlood:
+    def setup(self):
+        self.run, _ = sim_benchmark.setup_gloria_flood()
+
+    def time_generate(self):
+        self.run()
+
+
+class LWBRound:
+    def setup(self):
+        self.run, _ = sim_benchmark.setup_lwb_round()
+        self.run_plan, _ = sim_benchmark.setup_lwb_round_plan()
+
+    def time_create_rounds(self):
+        self.run()
+
+    def time_plan_rounds(self):
+        self.run_plan()
+
+
+class SimMessageChannel:
+    timeout = 120
+
+    def setup(self):
+        self.run, _ = sim_benchmark.setup_message_channel()
+
+    def time_queries(self):
+        self.run()
+
+
+class SimEventManager:
+    number = 1  # Every call continues the simulation of the same setup
+    repeat = 3
+    timeout = 120
+
+    def setup(self):
+        self.run, _ = sim_benchmark.setup_event_loop()
+
+    def time_loop(self):
+        self.run()
+
+    def peakmem_loop(self):
+        self.run()
+
+
+class Sim:
+    params = sim_benchmark.BENCHMARK_NODE_COUNTS
+    param_names = ['node_count']
+    number = 1  # A simulation only runs once per setup
+    repeat = 3
+    timeout = 600
+
+    def setup(self, node_count):
+        self.run, self.event_count = sim_benchmark.setup_sim_run(node_count=node_count)
+
+    def time_run(self, node_count):
+        self.run()
+
+    def peakmem_run(self, node_count):
+        self.run()
+
+    def track_events_per_second(self, node_count):
+        start = time.perf_counter()
+        events = self.run()
+        return events / (time.perf_counter() - start)
+
+    track_events_per_second.unit = "events/s"
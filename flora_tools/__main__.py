@@ -1,20 +1,17 @@
 import argparse
 import sys
-from multiprocessing import Pool
 
-from flora_tools.codegen.codegen import CodeGen
-from flora_tools.flocklab.measure_gloria import MeasureGloriaExperiment
-from flora_tools.flocklab.measure_links import MeasureLinksExperiment
-from flora_tools.sim.sim import Sim
-from flora_tools.toolchain.bootloader import Bootloader
-from flora_tools.toolchain.eclipse_patcher import EclipsePatcher
-from flora_tools.toolchain.elf_converter import ELFConverter
-from flora_tools.toolchain.platforms import Platform
-from flora_tools.toolchain.programmer import Programmer
-from flora_tools.trace_visualizer.server import VisualizationServer
+# Every subcommand imports its own subsystem, so that the CLI starts without loading the others (and their
+# dependencies such as pyserial, Flask or matplotlib). The option values come from the lightweight sim_options.
+from flora_tools.sim.sim_options import BENCHMARK_REPEAT, EVENT_HISTORY_POLICIES, SIM_LOG_LEVELS, EventHistoryPolicy
 
 
 def program_all_devices(flora_path):
+    from multiprocessing import Pool
+
+    from flora_tools.toolchain.bootloader import Bootloader
+    from flora_tools.toolchain.programmer import Programmer
+
     bootloaders = Bootloader.get_all()
 
     if len(bootloaders):
@@ -25,10 +22,15 @@ def program_all_devices(flora_path):
 
 
 def program_device(firmware_path, port):
+    from flora_tools.toolchain.programmer import Programmer
+
     Programmer.program_device(firmware_path, port)
 
 
 def patch_eclipse(flora_path):
+    from flora_tools.toolchain.eclipse_patcher import EclipsePatcher
+    from flora_tools.toolchain.platforms import Platform
+
     devkit_patcher = EclipsePatcher(flora_path, Platform.DEVKIT)
     devkit_patcher.patch()
     comboard_patcher = EclipsePatcher(flora_path, Platform.COMBOARD)
@@ -38,38 +40,101 @@ def patch_eclipse(flora_path):
 
 
 def convert_elf(flora_path):
+    from flora_tools.toolchain.elf_converter import ELFConverter
+    from flora_tools.toolchain.platforms import Platform
+
     devkit_elf_converter = ELFConverter(flora_path, Platform.DEVKIT)
     devkit_elf_converter.convert()
     comboard_elf_converter = ELFConverter(flora_path, Platform.COMBOARD)
     comboard_elf_converter.convert()
 
 
-def run_simulation(output_path, event_count: int = None, time_limit: float = None, seed: int = 0):
-    sim = Sim(output_path=output_path, event_count=event_count, time_limit=time_limit, seed=seed)
+def run_simulation(output_path, event_count: int = None, time_limit: float = None, seed: int = 0,
+                   load_snapshot=None, save_snapshot=None, profile=False, event_history='ring', log_level=None,
+                   fast_forward_sync=False):
+    from flora_tools.sim.sim import Sim
+    from flora_tools.sim.sim_logging import set_sim_log_level
+
+    if log_level is not None:
+        set_sim_log_level(log_level)
+
+    sim = Sim(output_path=output_path, event_count=event_count, time_limit=time_limit, seed=seed,
+              snapshot=load_snapshot, profile=profile, event_history=EventHistoryPolicy(event_history),
+              fast_forward_sync=fast_forward_sync)
     sim.run()
+    if save_snapshot is not None:
+        sim.save_snapshot(save_snapshot)
+
+
+def run_sweep(output_path, seeds, node_counts, path_losses, topologies, event_count: int = None,
+              time_limit: float = None, workers: int = None, dimensions: int = 2):
+    from flora_tools.sim.sim_sweep import SimSweep
+
+    sweep = SimSweep(output_path, seeds=seeds, node_counts=node_counts, path_losses=path_losses,
+                     event_count=event_count, time_limit=time_limit, topologies=topologies, workers=workers,
+                     dimensions=dimensions)
+    summary = sweep.run()
+    print(summary.to_string())
+
+
+def run_benchmark(output_path, benchmarks=None, node_counts=None, event_count: int = None,
+                  repeat: int = BENCHMARK_REPEAT, seed: int = 0, baseline=None):
+    from flora_tools.sim.sim_benchmark import SimBenchmark
+
+    benchmark = SimBenchmark(output_path, benchmarks=benchmarks, node_counts=node_counts, event_count=event_count,
+                             repeat=repeat, seed=seed)
+    results = benchmark.run()
+    print(results.to_string(index=False))
+
+    if baseline is not None:
+        comparison = SimBenchmark.compare(results, SimBenchmark.load(baseline))
+        print(comparison.to_string(index=False))
+        if comparison['regressed'].any():
+            sys.exit("Throughput regressed compared to the baseline {}".format(baseline))
+
+
+def get_benchmark_names():
+    from flora_tools.sim.sim_benchmark import BENCHMARKS
+
+    return list(BENCHMARKS)
+
+
+def parse_path_loss(path_loss: str):
+    path_loss = [float(value) for value in path_loss.split(':')]
+    if len(path_loss) != 2:
+        raise argparse.ArgumentTypeError("Path loss ranges are given as MIN:MAX (e.g. 90:140)")
+    return path_loss
 
 
 def flocklab_measure_links(register_test, local):
+    from flora_tools.flocklab.measure_links import MeasureLinksExperiment
+
     measure_links_experiment = MeasureLinksExperiment(local=local, register_test=register_test)
 
 
 def flocklab_measure_gloria(ack, register_test, local):
+    from flora_tools.flocklab.measure_gloria import MeasureGloriaExperiment
+
     measure_gloria_experiment = MeasureGloriaExperiment(ack=ack, local=local, register_test=register_test)
 
 
 def start_server():
+    from flora_tools.trace_visualizer.server import VisualizationServer
+
     VisualizationServer()
 
 
 def generate_code(flora_path):
+    from flora_tools.codegen.codegen import CodeGen
+
     code_gen = CodeGen(flora_path)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Executable flora_tools utilities', prog='flora_tools')
     parser.add_argument('command', help='Execute given command',
-                        choices=['program', 'program_all', 'patch_eclipse', 'run_simulation', 'flocklab_measure_links',
-                                 'flocklab_measure_gloria', 'generate_code', 'start_server', 'convert_elf'])
+                        choices=['program', 'program_all', 'patch_eclipse', 'run_simulation', 'run_sweep',
+                                 'run_benchmark', 'flocklab_measure_links', 'flocklab_measure_gloria', 'generate_code', 'start_server', 'convert_elf'])
     parser.add_argument('-d', '--path', help='Set the path to the Flora main repository folder or .hex/.binary file')
     parser.add_argument('-p', '--port', help='Set the serial port (e.g. "COM5" or "/dev/ttyUSB0")')
     parser.add_argument('-t', '--time', type=float,
@@ -78,6 +143,39 @@ def main():
                         help='Set the random number generators seed for reproducible results')
     parser.add_argument('-c', '--event_count', type=int,
                         help='Set the maximum number of events that get executed by the simulation')
+    parser.add_argument('--load_snapshot',
+                        help='Resume run_simulation from the given snapshot file instead of a new network')
+    parser.add_argument('--save_snapshot',
+                        help='Save a snapshot of the network to the given file after run_simulation finished')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the simulation per event callback and type, exported to the output directory')
+    parser.add_argument('--event_history', choices=EVENT_HISTORY_POLICIES, default='ring',
+                        help='Set which processed events the simulation keeps (spill writes them to --path)')
+    parser.add_argument('--log-level', choices=SIM_LOG_LEVELS,
+                        help='Set the log level of the simulation (INFO logs every event, DEBUG the event queue)')
+    parser.add_argument('--fast_forward_sync', action='store_true',
+                        help='Let unsynchronized nodes skip CAD scans of an idle channel until a transmission arrives')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Only log simulation warnings and errors, same as --log-level WARNING')
+    parser.add_argument('-n', '--seed_count', type=int, default=1,
+                        help='Set the number of consecutive seeds (starting at --seed) run by run_sweep')
+    parser.add_argument('--node_counts', type=int, nargs='+',
+                        help='Set the node counts of random and spatial topologies run by run_sweep (defaults to 5) '
+                             'or of the full simulations run by run_benchmark (defaults to 5, 20, 50 and 200)')
+    parser.add_argument('--path_losses', type=parse_path_loss, nargs='+', default=[[90, 140]],
+                        help='Set the path loss ranges MIN:MAX of random topologies run by run_sweep')
+    parser.add_argument('--topologies', nargs='+', choices=['random', 'flocklab', 'spatial'], default=['random'],
+                        help='Set the topologies run by run_sweep')
+    parser.add_argument('--dimensions', type=int, choices=[2, 3], default=2,
+                        help='Set whether spatial topologies place the nodes in 2D or 3D')
+    parser.add_argument('-w', '--workers', type=int,
+                        help='Set the number of worker processes used by run_sweep (defaults to the CPU count)')
+    parser.add_argument('--benchmarks', nargs='+',
+                        help='Set the benchmarks run by run_benchmark (defaults to all, see sim_benchmark.BENCHMARKS)')
+    parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT,
+                        help='Set how often run_benchmark repeats each benchmark, the best run counts')
+    parser.add_argument('--baseline',
+                        help='Compare run_benchmark to the given benchmark.json, exits with an error on regressions')
     parser.add_argument('-a', '--ack', action='store_true',
                         help='Runs Gloria measurements with Ack enabled')
     parser.add_argument('-r', '--register-test', action='store_true',
@@ -105,7 +203,28 @@ def main():
         if args.path is None:
             parser.error("run_simulation requires --path as simulation output directory.")
         else:
-            run_simulation(args.path, event_count=args.event_count, time_limit=args.time, seed=args.seed)
+            run_simulation(args.path, event_count=args.event_count, time_limit=args.time, seed=args.seed,
+                           load_snapshot=args.load_snapshot, save_snapshot=args.save_snapshot,
+                           profile=args.profile, event_history=args.event_history,
+                           log_level=('WARNING' if args.quiet else args.log_level),
+                           fast_forward_sync=args.fast_forward_sync)
+    elif args.command == 'run_sweep':
+        if args.path is None:
+            parser.error("run_sweep requires --path as sweep output directory.")
+        else:
+            run_sweep(args.path, list(range(args.seed, args.seed + args.seed_count)),
+                      (args.node_counts if args.node_counts is not None else [5]), args.path_losses, args.topologies,
+                      event_count=args.event_count, time_limit=args.time, workers=args.workers,
+                      dimensions=args.dimensions)
+    elif args.command == 'run_benchmark':
+        if args.path is None:
+            parser.error("run_benchmark requires --path as benchmark output directory.")
+        elif args.benchmarks is not None and not set(args.benchmarks) <= set(get_benchmark_names()):
+            parser.error("argument --benchmarks: invalid choice: {} (choose from {})".format(
+                [name for name in args.benchmarks if name not in get_benchmark_names()], get_benchmark_names()))
+        else:
+            run_benchmark(args.path, benchmarks=args.benchmarks, node_counts=args.node_counts,
+                          event_count=args.event_count, repeat=args.repeat, seed=args.seed, baseline=args.baseline)
     elif args.command == 'flocklab_measure_links':
         flocklab_measure_links(args.register_test, args.local)
     elif args.command == 'flocklab_measure_gloria':
@@ -1,4 +1,5 @@
 from flora_tools.experiment import *
+from flora_tools.radio_math import get_preamble_times
 
 
 class MeasureTimeSweepTxRx(Experiment):
@@ -92,12 +93,7 @@ class MeasureTimeSweepTxRx(Experiment):
 
         colors = df.apply(calculate_color, axis=1)
 
-        def calculate_relative_offset(row):
-            config = RadioConfiguration(row.modulation, preamble=row.preamble)
-            math = RadioMath(config)
-            return (row.offset / 8E6) / math.get_preamble_time()
-
-        relative_offsets = df.apply(calculate_relative_offset, axis=1) - 1
+        relative_offsets = (df.offset / 8E6) / get_preamble_times(df.modulation, df.preamble) - 1
 
         fig = plt.figure(figsize=[12, 8])
         # fig = plt.figure()
@@ -116,12 +112,7 @@ class MeasureTimeSweepTxRx(Experiment):
         for mod in mods:
             subset = df[df.modulation == mod]
 
-            def calculate_absolute_offset(row):
-                config = RadioConfiguration(row.modulation, preamble=row.preamble)
-                math = RadioMath(config)
-                return (row.offset / 8) - math.get_preamble_time() * 1E6
-
-            absolute_offsets = subset.apply(calculate_absolute_offset, axis=1)
+            absolute_offsets = (subset.offset / 8) - get_preamble_times(subset.modulation, subset.preamble) * 1E6
 
             colors = subset.apply(calculate_color, axis=1)
             plt.scatter(subset.preamble, absolute_offsets, c=colors)
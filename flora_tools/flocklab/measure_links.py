@@ -6,13 +6,14 @@ from typing import List
 import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
 import pandas as pd
 
 import flora_tools.lwb_slot as lwb_slot
 from flora_tools.flocklab.flocklab import FlockLab, FLOCKLAB_TARGET_ID_LIST, FLOCKLAB_TARGET_POSITIONS
 from flora_tools.node import Node
 from flora_tools.radio_configuration import RadioConfiguration
-from flora_tools.radio_math import RadioMath
+from flora_tools.radio_math import RadioMath, get_message_toas
 
 ITERATIONS = 5
 POWERS = [0, 10, 22]
@@ -106,62 +107,59 @@ class MeasureLinksExperiment:
 
             subset = df[(df.node_id == node) & (df.rx == True)]
 
+            # Reception windows of all radio configurations of the node at once
+            configs = subset[subset.output.apply(
+                lambda output: (type(output) is dict and 'type' in output and output['type'] == 'radio_cfg'
+                                and 'power' in output))]
+            modulations = [output['modulation'] for output in configs.output]
+            powers = [output['power'] for output in configs.output]
+            preambles = [output['preamble'] for output in configs.output]
+            messages = ["Hello World! from FlockLab Node {}: Mod: {:d}, Pow: {:d}, Prmbl: {:d}".format(
+                node, modulation, power, preamble)
+                for modulation, power, preamble in zip(modulations, powers, preambles)]
+            offsets = np.atleast_1d(
+                get_message_toas(modulations, [len(message) + 1 for message in messages], preambles) * 1.5 + 0.3)
+
             counter = 0
 
-            for index, row in subset.iterrows():
+            for timestamp, modulation, power, preamble, message, offset in zip(
+                    configs.timestamp, modulations, powers, preambles, messages, offsets):
                 counter += 1
                 if (counter % 100) == 0:
                     print("{}@{}".format(counter, node), end=',')
 
-                if (type(row['output']) is dict
-                        and 'type' in row['output']
-                        and row['output']['type'] == 'radio_cfg'
-                        and 'power' in row['output']):
-
-                    modulation = row['output']['modulation']
-                    power = row['output']['power']
-                    preamble = row['output']['preamble']
-
-                    config = RadioConfiguration(modulation, preamble=preamble)
-                    math = RadioMath(config)
-
-                    message = "Hello World! from FlockLab Node {}: Mod: {:d}, Pow: {:d}, Prmbl: {:d}".format(
-                        node, modulation, power, preamble)
-
-                    offset = math.get_message_toa(len(message) + 1) * 1.5 + 0.3
-
-                    rx_subset = df[(df.timestamp > row.timestamp)
-                                   & (df.timestamp < (row.timestamp + offset))
-                                   & (df.node_id != node)
-                                   & (df.rx == True)]
-
-                    receptions.append(pd.DataFrame({
-                        'tx_node': [node],
-                        'rx_node': [None],
-                        'modulation': [modulation],
-                        'power': [power],
-                        'preamble': [preamble],
-                        'rssi': [None],
-                        'snr': [None],
-                        'timestamp': [row.timestamp],
-                    }))
-
-                    for rx_index, rx_row in rx_subset.iterrows():
-                        if (type(rx_row['output']) is dict
-                                and 'type' in rx_row['output']
-                                and rx_row['output']['type'] == 'radio_rx_msg'
-                                and 'text' in rx_row['output']
-                                and rx_row['output']['text'] == message):
-                            receptions.append(pd.DataFrame({
-                                'tx_node': [node],
-                                'rx_node': [rx_row['node_id']],
-                                'modulation': [modulation],
-                                'power': [power],
-                                'preamble': [preamble],
-                                'rssi': [rx_row['output']['rssi']],
-                                'snr': [rx_row['output']['snr']],
-                                'timestamp': [row.timestamp],
-                            }))
+                rx_subset = df[(df.timestamp > timestamp)
+                               & (df.timestamp < (timestamp + offset))
+                               & (df.node_id != node)
+                               & (df.rx == True)]
+
+                receptions.append(pd.DataFrame({
+                    'tx_node': [node],
+                    'rx_node': [None],
+                    'modulation': [modulation],
+                    'power': [power],
+                    'preamble': [preamble],
+                    'rssi': [None],
+                    'snr': [None],
+                    'timestamp': [timestamp],
+                }))
+
+                for rx_index, rx_row in rx_subset.iterrows():
+                    if (type(rx_row['output']) is dict
+                            and 'type' in rx_row['output']
+                            and rx_row['output']['type'] == 'radio_rx_msg'
+                            and 'text' in rx_row['output']
+                            and rx_row['output']['text'] == message):
+                        receptions.append(pd.DataFrame({
+                            'tx_node': [node],
+                            'rx_node': [rx_row['node_id']],
+                            'modulation': [modulation],
+                            'power': [power],
+                            'preamble': [preamble],
+                            'rssi': [rx_row['output']['rssi']],
+                            'snr': [rx_row['output']['snr']],
+                            'timestamp': [timestamp],
+                        }))
 
         receptions = pd.concat(receptions, ignore_index=True)
 
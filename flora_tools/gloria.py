@@ -4,7 +4,8 @@ from typing import List
 import numpy as np
 
 import flora_tools.lwb_slot as lwb_slot
-from flora_tools.radio_configuration import RadioConfiguration, MCU_PROC_POWER, RADIO_TIMER_PERIOD
+from flora_tools.radio_configuration import RadioConfiguration, MCU_PROC_POWER, RADIO_TIMER_PERIOD, \
+    get_radio_configuration
 from flora_tools.radio_math import RadioMath
 
 DEFAULT_BAND = 48
@@ -64,6 +65,9 @@ PREAMBLE_PRE_LISTENING = [3 / 14.25, 3 / 14.25, 3 / 14.25, 3 / 14.25, 3 / 14.25,
 PREAMBLE_POST_LISTENING = [3 / 14.25, 3 / 14.25, 3 / 14.25, 3 / 14.25, 3 / 14.25, 3 / 14.25, 5 / 16.25, 5 / 16.25, 4.0,
                            4.0]
 
+GLORIA_TIMINGS = {}  # Shared GloriaTimings per (modulation, safety_factor), see get_gloria_timings()
+GLORIA_FLOOD_TEMPLATES = {}  # Flood layouts relative to the flood marker, see GloriaFloodTemplate.get()
+
 
 class GloriaSlotType(Enum):
     TX = 1
@@ -143,10 +147,10 @@ class GloriaSlot:
     @property
     def energy(self):
         if self.type is GloriaSlotType.TX or self.type is GloriaSlotType.TX_ACK:
-            return RadioConfiguration(self.flood.modulation).tx_energy(self.power, self.active_time) + (
+            return RadioConfiguration.tx_energy(self.power, self.active_time) + (
                     self.flood.gloria_timings.tx_setup_time + self.flood.gloria_timings.tx_irq_time) * MCU_PROC_POWER
         else:
-            return RadioConfiguration(self.flood.modulation).rx_energy(self.active_time) + (
+            return RadioConfiguration.rx_energy(self.active_time) + (
                     self.flood.gloria_timings.rx_setup_time + self.flood.gloria_timings.rx_irq_time) * MCU_PROC_POWER
 
     @property
@@ -160,9 +164,11 @@ class GloriaSlot:
 class GloriaFlood:
     def __init__(self, lwb_slot: 'lwb_slot.LWBSlot', modulation: int, payload: int, retransmission_count: int,
                  hop_count: int,
-                 is_ack=False, safety_factor=2, is_master=True, power=10, band: int = None):
+                 is_ack=False, safety_factor=2, is_master=True, power=10, band: int = None, low_power: bool = None):
         if band is None:
             band = DEFAULT_BAND
+        if low_power is None:
+            low_power = lwb_slot is not None and lwb_slot.round.low_power
 
         self.lwb_slot = lwb_slot
         self.modulation = modulation
@@ -173,13 +179,15 @@ class GloriaFlood:
         self.safety_factor = safety_factor
         self.is_master = is_master
         self.power = power
-        self.gloria_timings = GloriaTimings(modulation=self.modulation)
+        self.gloria_timings = get_gloria_timings(self.modulation)
         self.band = band
+        self.low_power = low_power
 
         self.total_time = None
         self.overhead = None
 
-        self.slots: List[GloriaSlot] = []
+        self.template: GloriaFloodTemplate = None
+        self._slots: List[GloriaSlot] = []
 
     @property
     def flood_marker(self):
@@ -187,54 +195,94 @@ class GloriaFlood:
 
     @property
     def data_slot_count(self):
-        if self.lwb_slot.round.low_power:
+        if self.low_power:
             return 1
         else:
             return (2 * self.retransmission_count - 1) + (self.hop_count - 1)
 
     def generate(self):
-        temp_slot = GloriaSlot(self, 0, type=GloriaSlotType.TX)
-        temp_ack_slot = GloriaSlot(self, 0, type=GloriaSlotType.RX_ACK, payload=GLORIA_ACK_LENGTH)
+        self.template = GloriaFloodTemplate.get(self)
+        self.overhead = self.template.overhead
+        self.total_time = self.template.total_time
+        self._slots = None
+
+    @property
+    def slots(self) -> List[GloriaSlot]:
+        # Slots are only materialized on demand, most floods are just laid out by their total time
+        if self._slots is None:
+            self._slots = [GloriaSlot(self, offset, type=type, payload=payload, power=power)
+                           for offset, type, payload, power in self.template.slots]
+        return self._slots
+
+    @property
+    def energy(self):
+        if self.template.energy is None:
+            energy = self.overhead * MCU_PROC_POWER
+            for slot in self.slots:
+                energy += slot.energy
+            self.template.energy = energy
+
+        return self.template.energy
+
+    @property
+    def bitrate(self):
+        return self.payload * 8 / self.total_time
 
-        self.overhead = self.gloria_timings.flood_init_overhead + self.gloria_timings.sleep_time
+
+class GloriaFloodTemplate:
+    def __init__(self, flood: GloriaFlood):
+        data_slot_count = flood.data_slot_count
+
+        temp_slot = GloriaSlot(flood, 0, type=GloriaSlotType.TX)
+        temp_ack_slot = GloriaSlot(flood, 0, type=GloriaSlotType.RX_ACK, payload=GLORIA_ACK_LENGTH)
+
+        self.overhead = flood.gloria_timings.flood_init_overhead + flood.gloria_timings.sleep_time
 
         self.total_time = (
                 self.overhead +
-                self.data_slot_count * temp_slot.slot_time +
-                (self.data_slot_count - 1) * (temp_ack_slot.slot_time if self.acked else 0)
+                data_slot_count * temp_slot.slot_time +
+                (data_slot_count - 1) * (temp_ack_slot.slot_time if flood.acked else 0)
         )
 
-        offset = self.gloria_timings.flood_init_overhead
+        self.slots = []  # (slot_offset, type, payload, power)
+        self.energy = None
 
-        for i in range(self.data_slot_count):
-            if (i % 2) ^ self.is_master:
-                slot = GloriaSlot(self, offset, type=GloriaSlotType.TX)
+        offset = flood.gloria_timings.flood_init_overhead
+
+        for i in range(data_slot_count):
+            if (i % 2) ^ flood.is_master:
+                slot = GloriaSlot(flood, offset, type=GloriaSlotType.TX)
             else:
-                slot = GloriaSlot(self, offset, type=GloriaSlotType.RX)
+                slot = GloriaSlot(flood, offset, type=GloriaSlotType.RX)
 
-            self.slots.append(slot)
+            self.slots.append((slot.slot_offset, slot.type, slot.payload, slot.power))
 
-            if self.acked and i < self.data_slot_count - 1:  # No ACK required for last data slot
+            if flood.acked and i < data_slot_count - 1:  # No ACK required for last data slot
                 offset += slot.slot_time
-                ack_slot = GloriaSlot(self, offset, GloriaSlotType.RX_ACK, payload=GLORIA_ACK_LENGTH, power=self.power)
-                self.slots.append(ack_slot)
+                ack_slot = GloriaSlot(flood, offset, GloriaSlotType.RX_ACK, payload=GLORIA_ACK_LENGTH,
+                                      power=flood.power)
+                self.slots.append((ack_slot.slot_offset, ack_slot.type, ack_slot.payload, ack_slot.power))
 
                 offset += ack_slot.slot_time
             else:
                 offset += slot.slot_time
-        return
 
-    @property
-    def energy(self):
-        energy = self.overhead * MCU_PROC_POWER
-        for slot in self.slots:
-            energy += slot.energy
+    @staticmethod
+    def get(flood: GloriaFlood) -> 'GloriaFloodTemplate':
+        key = (flood.modulation, flood.payload, flood.acked, flood.is_master, flood.data_slot_count, flood.power)
+        template = GLORIA_FLOOD_TEMPLATES.get(key)
+        if template is None:
+            template = GloriaFloodTemplate(flood)
+            GLORIA_FLOOD_TEMPLATES[key] = template
+        return template
 
-        return energy
 
-    @property
-    def bitrate(self):
-        return self.payload * 8 / self.total_time
+def get_gloria_timings(modulation: int, safety_factor: int = 2) -> 'GloriaTimings':
+    timings = GLORIA_TIMINGS.get((modulation, safety_factor))
+    if timings is None:
+        timings = GloriaTimings(modulation, safety_factor=safety_factor)
+        GLORIA_TIMINGS[(modulation, safety_factor)] = timings
+    return timings
 
 
 class GloriaTimings:
@@ -242,7 +290,7 @@ class GloriaTimings:
         self.modulation = modulation
         self.safety_factor = safety_factor
 
-        self.radio_config = RadioConfiguration(self.modulation)
+        self.radio_config = get_radio_configuration(self.modulation)
         self.radio_math = RadioMath(self.radio_config)
 
     @property
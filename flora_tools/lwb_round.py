@@ -4,12 +4,13 @@ from typing import Union
 
 import numpy as np
 
-from pandas._libs.tslibs import np_datetime
-
 import flora_tools.lwb_slot as lwb_slot
-import flora_tools.sim.sim_node as sim_node
-import flora_tools.sim.lwb_stream as stream
-from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.radio_configuration import get_radio_configuration
+
+if typing.TYPE_CHECKING:
+    # Annotations only, the timing model does not depend on the simulator
+    import flora_tools.sim.lwb_stream as stream
+    import flora_tools.sim.sim_node as sim_node
 
 LWB_MAX_SLOT_COUNT = [2, 2, 4, 4, 6, 6, 16, 16, 32, 32]
 LWB_MAX_STREAM_REQUEST_SLOT_COUNT = [2, 2, 4, 8]
@@ -69,7 +70,7 @@ class LWBRound:
         self.round_marker = round_marker
         self.modulation = modulation
         self.gloria_modulation = lwb_slot.RADIO_MODULATIONS[self.modulation]
-        self.radio_configuration = RadioConfiguration(self.gloria_modulation)
+        self.radio_configuration = get_radio_configuration(self.gloria_modulation)
         self.type = type
         self.master = master
         self.layout = layout
@@ -145,6 +146,96 @@ class LWBRound:
             slot_offset += np.ceil(slot.total_time / lwb_slot.LWB_SCHEDULE_GRANULARITY) * lwb_slot.LWB_SCHEDULE_GRANULARITY
             index += 1
 
+    @staticmethod
+    def create_sync_round(round_marker: float, modulation: int, master: 'sim_node.SimNode' = None):
+        return LWBRoundPlan.create_sync_round(round_marker, modulation, master).build()
+
+    @staticmethod
+    def create_data_round(round_marker: float, modulation: int, data_slots, master: 'sim_node.SimNode' = None):
+        return LWBRoundPlan.create_data_round(round_marker, modulation, data_slots, master).build()
+
+    @staticmethod
+    def create_stream_request_round(round_marker: float, modulation: int, contention_count: int,
+                                    master: 'sim_node.SimNode' = None):
+        return LWBRoundPlan.create_stream_request_round(round_marker, modulation, contention_count, master).build()
+
+    @staticmethod
+    def create_notification_round(round_marker: float, modulation: int, data_slots,
+                                  master: 'sim_node.SimNode' = None):
+        return LWBRoundPlan.create_notification_round(round_marker, modulation, data_slots, master).build()
+
+    @staticmethod
+    def create_lp_notification_round(round_marker: float, modulation: int, notification_count: int,
+                                     master: 'sim_node.SimNode' = None):
+        return LWBRoundPlan.create_lp_notification_round(round_marker, modulation, notification_count,
+                                                         master).build()
+
+
+class LWBRoundPlan:
+    # Timing of a round taken from its layout and the cached slot times of lwb_slot.get_slot_time(), without creating
+    # any LWBSlot or GloriaFlood. Rounds are planned and condensed as plans, only the round that runs gets built.
+    def __init__(self, round_marker, modulation, type: LWBRoundType,
+                 master: 'sim_node.SimNode' = None, layout: typing.List[LWBSlotItem] = []):
+        self.round_marker = round_marker
+        self.modulation = modulation
+        self.type = type
+        self.master = master
+        self.layout = layout
+
+        self.slot_offsets: typing.List[float] = []
+        self.slot_times: typing.List[float] = []
+
+        self.generate()
+
+    def __str__(self):
+        return "<LWBRoundPlan:{:f},{:d},{}>".format(self.round_marker, self.modulation, self.type)
+
+    @property
+    def low_power(self):
+        return self.type is LWBRoundType.LP_NOTIFICATION
+
+    @property
+    def total_time(self):
+        return self.round_end_marker - self.round_marker
+
+    @property
+    def round_end_marker(self):
+        return self.round_marker + self.slot_offsets[-1] + self.slot_times[-1]
+
+    def generate(self):
+        # Mirrors LWBRound.generate(), including its accumulation of the slot offsets
+        slot_schedule_payload = lwb_slot.LWB_SLOT_SCHEDULE_HEADER_LENGTH + LWB_MAX_SLOT_COUNT[
+            lwb_slot.RADIO_MODULATIONS[self.modulation]] * lwb_slot.LWB_SLOT_SCHEDULE_ITEM_LENGTH
+
+        slot_offset = 0
+
+        item: LWBSlotItem
+        for item in self.layout:
+            if item.type is LWBSlotItemType.SYNC:
+                slots = [(lwb_slot.GLORIA_HEADER_LENGTH, False)]
+            elif item.type is LWBSlotItemType.ROUND_SCHEDULE:
+                slots = [(lwb_slot.LWB_ROUND_SCHEDULE_LENGTH, False)]
+            elif item.type is LWBSlotItemType.SLOT_SCHEDULE:
+                slots = [(slot_schedule_payload, False)]
+            elif item.type is LWBSlotItemType.CONTENTION:
+                slots = [(lwb_slot.LWB_CONTENTION_HEADER_LENGTH, True), (lwb_slot.GLORIA_HEADER_LENGTH, True)]
+            elif item.type is LWBSlotItemType.ROUND_CONTENTION:
+                slots = [(lwb_slot.LWB_CONTENTION_HEADER_LENGTH, True)]
+            elif item.type is LWBSlotItemType.DATA:
+                slots = [(item.payload, True), (lwb_slot.GLORIA_HEADER_LENGTH, True)]
+            else:
+                slots = []
+
+            for payload, is_ack in slots:
+                slot_time = lwb_slot.get_slot_time(self.modulation, payload, is_ack=is_ack, low_power=self.low_power)
+                self.slot_offsets.append(slot_offset)
+                self.slot_times.append(slot_time)
+                slot_offset += (np.ceil(slot_time / lwb_slot.LWB_SCHEDULE_GRANULARITY)
+                                * lwb_slot.LWB_SCHEDULE_GRANULARITY)
+
+    def build(self) -> LWBRound:
+        return LWBRound(self.round_marker, self.modulation, self.type, self.master, self.layout)
+
     @staticmethod
     def create_sync_round(round_marker: float, modulation: int, master: 'sim_node.SimNode' = None):
         layout = []
@@ -153,7 +244,7 @@ class LWBRound:
         layout.append(LWBSlotItem(LWBSlotItemType.ROUND_CONTENTION))
         layout.append(LWBSlotItem(LWBSlotItemType.ROUND_SCHEDULE))
 
-        return LWBRound(round_marker, modulation, type=LWBRoundType.SYNC, layout=layout, master=master)
+        return LWBRoundPlan(round_marker, modulation, type=LWBRoundType.SYNC, layout=layout, master=master)
 
     @staticmethod
     def create_data_round(round_marker: float, modulation: int, data_slots, master: 'sim_node.SimNode' = None):
@@ -167,7 +258,7 @@ class LWBRound:
                                       stream=item.stream))
         layout.append(LWBSlotItem(LWBSlotItemType.ROUND_SCHEDULE, master=master))
 
-        return LWBRound(round_marker, modulation, type=LWBRoundType.DATA, layout=layout, master=master)
+        return LWBRoundPlan(round_marker, modulation, type=LWBRoundType.DATA, layout=layout, master=master)
 
     @staticmethod
     def create_stream_request_round(round_marker: float, modulation: int, contention_count: int,
@@ -178,7 +269,7 @@ class LWBRound:
             layout.append(LWBSlotItem(LWBSlotItemType.CONTENTION))
         layout.append(LWBSlotItem(LWBSlotItemType.ROUND_SCHEDULE, master=master))
 
-        return LWBRound(round_marker, modulation, type=LWBRoundType.STREAM_REQUEST, layout=layout, master=master)
+        return LWBRoundPlan(round_marker, modulation, type=LWBRoundType.STREAM_REQUEST, layout=layout, master=master)
 
     @staticmethod
     def create_notification_round(round_marker: float, modulation: int, data_slots,
@@ -191,7 +282,7 @@ class LWBRound:
                                       payload=item.data_payload, stream=item.stream))
         layout.append(LWBSlotItem(LWBSlotItemType.ROUND_SCHEDULE, master=master))
 
-        return LWBRound(round_marker, modulation, type=LWBRoundType.NOTIFICATION, layout=layout, master=master)
+        return LWBRoundPlan(round_marker, modulation, type=LWBRoundType.NOTIFICATION, layout=layout, master=master)
 
     @staticmethod
     def create_lp_notification_round(round_marker: float, modulation: int, notification_count: int,
@@ -200,4 +291,4 @@ class LWBRound:
         for i in range(notification_count):
             layout.append(LWBSlotItem(LWBSlotItemType.CONTENTION, master=master))
 
-        return LWBRound(round_marker, modulation, type=LWBRoundType.LP_NOTIFICATION, layout=layout, master=master)
+        return LWBRoundPlan(round_marker, modulation, type=LWBRoundType.LP_NOTIFICATION, layout=layout, master=master)
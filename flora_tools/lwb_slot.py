@@ -1,11 +1,15 @@
 from enum import Enum
+from typing import TYPE_CHECKING
 
 import numpy as np
 
 import flora_tools.gloria as gloria
 import flora_tools.lwb_round as lwb_round
-import flora_tools.sim.sim_node as sim_node
-from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.radio_configuration import get_radio_configuration
+
+if TYPE_CHECKING:
+    # Annotations only, the timing model does not depend on the simulator
+    import flora_tools.sim.sim_node as sim_node
 
 GLORIA_DEFAULT_POWER_LEVELS = [1, 1, 1, 1, 0, 0, 0, 0, 0, 0]
 GLORIA_RETRANSMISSIONS_COUNTS = [1, 1, 1, 1, 2, 2, 2, 2, 2, 2]
@@ -67,6 +71,22 @@ LWB_ROUND_SCHEDULE_ITEM = 6
 LWB_ROUND_SCHEDULE_ITEM_COUNT = len(RADIO_MODULATIONS) * 1
 LWB_ROUND_SCHEDULE_LENGTH = GLORIA_HEADER_LENGTH + LWB_ROUND_SCHEDULE_ITEM_COUNT * LWB_ROUND_SCHEDULE_ITEM
 
+LWB_SLOT_TIMES = {}  # Slot durations per (modulation, payload, is_ack, low_power), see get_slot_time()
+
+
+def get_slot_time(modulation: int, payload: int, is_ack=True, low_power=False):
+    # Same as LWBSlot.total_time, which neither depends on the power level nor on the master
+    key = (modulation, payload, is_ack, low_power)
+    slot_time = LWB_SLOT_TIMES.get(key)
+    if slot_time is None:
+        gloria_modulation = RADIO_MODULATIONS[modulation]
+        flood = gloria.GloriaFlood(None, gloria_modulation, payload, GLORIA_RETRANSMISSIONS_COUNTS[gloria_modulation],
+                                   GLORIA_HOP_COUNTS[gloria_modulation], is_ack=is_ack, low_power=low_power)
+        flood.generate()
+        slot_time = np.ceil(flood.total_time / LWB_SCHEDULE_GRANULARITY) * LWB_SCHEDULE_GRANULARITY
+        LWB_SLOT_TIMES[key] = slot_time
+    return slot_time
+
 
 class LWBSlotType(Enum):
     SYNC = 1
@@ -103,7 +123,7 @@ class LWBSlot:
 
         self.flood: gloria.GloriaFlood = None
 
-        self.radio_configuration = RadioConfiguration(self.gloria_modulation)
+        self.radio_configuration = get_radio_configuration(self.gloria_modulation)
 
         self.generate()
 
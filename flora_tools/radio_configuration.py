@@ -1,7 +1,5 @@
 from enum import Enum
 
-import matplotlib
-import matplotlib.cm
 import numpy as np
 
 HS_TIMER_SCHEDULE_MARGIN = 800  # 100 μs
@@ -216,8 +214,25 @@ RADIO_CONFIGURATIONS = [
     {'modem': RadioModem.FSK, 'bandwidth': 234300, 'datarate': 200000, 'preamble_len': 2, 'fdev': 10000},
 ]
 
+INTERNED_RADIO_CONFIGURATIONS = {}  # Shared configurations, see get_radio_configuration()
+FROZEN_RADIO_PROPERTIES = ['modem', 'sf', 'coderate', 'bandwidth', 'real_bandwidth', 'bitrate', 'symbol_rate',
+                           'low_data_rate', 'explicit_header', 'preamble_len']
+
+
+def get_radio_configuration(modulation=0, band=48, power=0, bandwidth=None, tx=True, crc=True, implicit=0,
+                            irq_direct=False, preamble=None, bitrate=None) -> 'FrozenRadioConfiguration':
+    key = (modulation, band, power, bandwidth, bool(tx), crc, implicit, irq_direct, preamble, bitrate)
+    configuration = INTERNED_RADIO_CONFIGURATIONS.get(key)
+    if configuration is None:
+        configuration = FrozenRadioConfiguration(*key)
+        INTERNED_RADIO_CONFIGURATIONS[key] = configuration
+    return configuration
+
 
 class RadioConfiguration:
+    __slots__ = ('modulation', 'band', 'power', 'tx', 'preamble', 'irq_direct', 'custom_bandwidth', 'custom_bitrate',
+                 'crc', 'implicit')
+
     def __init__(self, modulation=0, band=48, power=0, bandwidth=None, tx=True, crc=True, implicit=0, irq_direct=False,
                  preamble=None, bitrate=None):
         self.modulation = modulation
@@ -426,6 +441,8 @@ class RadioConfiguration:
 
     @property
     def color(self):
+        import matplotlib.cm  # Only needed for plotting, not by the timing model
+
         if self.modem is RadioModem.LORA:
             cmap = matplotlib.cm.get_cmap('plasma')
             return cmap(self.modulation / 12)
@@ -483,3 +500,76 @@ class RadioConfiguration:
     def tx_energy(power, duration):
         current = np.interp(power, TX_CURRENT_LOOKUP_TABLE[0], TX_CURRENT_LOOKUP_TABLE[1])
         return VOLTAGE * current * duration
+
+
+class FrozenRadioConfiguration(RadioConfiguration):
+    # Immutable configuration shared by everyone calling get_radio_configuration() with the same parameters. The
+    # derived properties are computed once, modifiable configurations are made with copy().
+    __slots__ = ('key', '_modem', '_sf', '_coderate', '_bandwidth', '_real_bandwidth', '_bitrate', '_symbol_rate',
+                 '_low_data_rate', '_explicit_header', '_preamble_len', '_sensitivity')
+
+    def __init__(self, *key):
+        super().__init__(*key)
+
+        mutable = RadioConfiguration(*key)
+        for name in FROZEN_RADIO_PROPERTIES:
+            object.__setattr__(self, '_' + name, getattr(mutable, name))
+        object.__setattr__(self, '_sensitivity', None)
+        object.__setattr__(self, 'key', key)  # Assigned last, freezes the configuration
+
+    def __setattr__(self, name, value):
+        if hasattr(self, 'key'):
+            raise AttributeError("Interned radio configurations are immutable, modify a copy() instead")
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        # Unpickled configurations are interned again
+        return get_radio_configuration, self.key
+
+    @property
+    def modem(self):
+        return self._modem
+
+    @property
+    def sf(self):
+        return self._sf
+
+    @property
+    def coderate(self):
+        return self._coderate
+
+    @property
+    def bandwidth(self):
+        return self._bandwidth
+
+    @property
+    def real_bandwidth(self):
+        return self._real_bandwidth
+
+    @property
+    def bitrate(self):
+        return self._bitrate
+
+    @property
+    def symbol_rate(self):
+        return self._symbol_rate
+
+    @property
+    def low_data_rate(self):
+        return self._low_data_rate
+
+    @property
+    def explicit_header(self):
+        return self._explicit_header
+
+    @property
+    def preamble_len(self):
+        return self._preamble_len
+
+    @property
+    def sensitivity(self):
+        if self._sensitivity is None:
+            from flora_tools.radio_math import RadioMath  # Circular, radio_math depends on this module
+
+            object.__setattr__(self, '_sensitivity', RadioMath(self).sensitivity)
+        return self._sensitivity
@@ -1,7 +1,9 @@
+from functools import lru_cache
+
 import numpy as np
-import pandas as pd
 
-from flora_tools.radio_configuration import RadioConfiguration, RadioModem
+from flora_tools.radio_configuration import RadioConfiguration, RadioModem, RADIO_CONFIGURATIONS, \
+    get_radio_configuration
 
 LORA_SYMB_TIMES = [  # in ms
     [32.768, 16.384, 8.192, 4.096, 2.048, 1.024, 0.512, 0.256],  # 125 kHz
@@ -75,12 +77,42 @@ SENSITIVITIES = [  # Based on values in the SX1276 datasheet (Rev. 5) if not dec
     {'modem': RadioModem.LORA, 'sf': 5, 'bandwidth': 500000, 'sensitivity': -108},  # SX1262 only (estimation)
 ]
 
+TOA_TABLE_SIZE = 256  # Payload sizes 0-255 are looked up, all others are calculated
+TOA_TABLES = {}  # Process-wide time-on-air tables, see RadioMath.get_toa_table()
+SYMBOL_TIMES = {}
+MODULATION_TABLE = {}  # Parameters of the default configurations indexed by modulation, see get_modulation_table()
+
+
+@lru_cache(maxsize=None)
+def lookup_sensitivity(modem: RadioModem, sf, real_bandwidth, bitrate):
+    if modem is RadioModem.LORA:
+        sensitivities = [item['sensitivity'] for item in SENSITIVITIES if
+                         item.get('sf') == sf and item['bandwidth'] == real_bandwidth]
+    else:
+        sensitivities = [item['sensitivity'] for item in SENSITIVITIES if
+                         'bitrate' in item and item['bitrate'] >= bitrate and item['bandwidth'] >= real_bandwidth]
+
+    return sorted(sensitivities)[0] + RF_SWITCH_INSERTION_LOSS
+
 
 class RadioMath:
     def __init__(self, configuration: RadioConfiguration):
         self.configuration = configuration
 
+    @property
+    def configuration_key(self):
+        return (self.configuration.modulation, self.configuration.custom_bandwidth, self.configuration.custom_bitrate,
+                self.configuration.crc, self.configuration.implicit)
+
     def get_symbol_time(self):
+        key = self.configuration_key[0:3]
+        ts = SYMBOL_TIMES.get(key)
+        if ts is None:
+            ts = self.calculate_symbol_time()
+            SYMBOL_TIMES[key] = ts
+        return ts
+
+    def calculate_symbol_time(self):
         if self.configuration.modem.value is RadioModem.LORA.value:
             ts = LORA_SYMB_TIMES[self.configuration.bandwidth][int(self.configuration.modulation)] / 1000.0
         elif self.configuration.modem.value is RadioModem.FSK.value:
@@ -104,6 +136,29 @@ class RadioMath:
         if not preamble_length:
             preamble_length = self.configuration.preamble_len
 
+        if isinstance(payload_size, (int, np.integer)) and 0 <= payload_size < TOA_TABLE_SIZE:
+            return self.get_toa_table(preamble_length, sync=sync, ceil_overhead=ceil_overhead)[payload_size]
+        else:
+            return self.calculate_message_toa(payload_size, preamble_length, sync=sync, ceil_overhead=ceil_overhead)
+
+    def get_toa_table(self, preamble_length=0, sync=False, ceil_overhead=True) -> np.ndarray:
+        if not preamble_length:
+            preamble_length = self.configuration.preamble_len
+
+        key = self.configuration_key + (preamble_length, sync, ceil_overhead)
+        table = TOA_TABLES.get(key)
+        if table is None:
+            table = np.array([self.calculate_message_toa(payload_size, preamble_length, sync=sync,
+                                                         ceil_overhead=ceil_overhead)
+                              for payload_size in range(TOA_TABLE_SIZE)])
+            table.flags.writeable = False
+            TOA_TABLES[key] = table
+        return table
+
+    def calculate_message_toa(self, payload_size=0, preamble_length=0, sync=False, ceil_overhead=True):
+        if not preamble_length:
+            preamble_length = self.configuration.preamble_len
+
         if self.configuration.modem.value is RadioModem.LORA.value:
             ts = self.get_symbol_time()
             preamble_time = self.get_preamble_time(preamble_length)
@@ -154,24 +209,18 @@ class RadioMath:
 
     @staticmethod
     def get_sync_time(modulation):
-        return RadioMath(RadioConfiguration(modulation)).sync_time
+        return RadioMath(get_radio_configuration(modulation)).sync_time
 
     def get_datarate(self, payload_size=255):
         pass
 
     @property
     def sensitivity(self):
-        global SENSITIVITIES
         if self.configuration.modem.value is RadioModem.LORA.value:
-            df = pd.DataFrame(SENSITIVITIES)
-            sensitivity = df[(df.sf == self.configuration.sf) & (
-                    df.bandwidth == self.configuration.real_bandwidth)].sensitivity.sort_values().iloc[0]
-            return sensitivity + RF_SWITCH_INSERTION_LOSS
+            return lookup_sensitivity(RadioModem.LORA, self.configuration.sf, self.configuration.real_bandwidth, None)
         else:
-            df = pd.DataFrame(SENSITIVITIES)
-            sensitivity = df[(df.bitrate >= self.configuration.bitrate) & (
-                    df.bandwidth >= self.configuration.real_bandwidth)].sensitivity.sort_values().iloc[0]
-            return sensitivity + RF_SWITCH_INSERTION_LOSS
+            return lookup_sensitivity(RadioModem.FSK, None, self.configuration.real_bandwidth,
+                                      self.configuration.bitrate)
 
     def link_budget(self, power=22):
         return -(self.sensitivity - power + RF_SWITCH_INSERTION_LOSS)
@@ -227,3 +276,84 @@ class RadioMath:
 
         math = RadioMath(config)
         return config.tx_energy(power, math.get_message_toa(MAX_PACKET)) / (MAX_PACKET * 8)
+
+
+# Array counterparts of RadioMath for bulk analysis. Arguments broadcast against each other like NumPy ufuncs and
+# describe the default configuration of each modulation (CRC on, explicit header). Preamble lengths of 0 select the
+# modulation's default, like the preamble_length arguments of RadioMath.
+
+def get_modulation_table():
+    if not MODULATION_TABLE:
+        configurations = [get_radio_configuration(modulation) for modulation in range(len(RADIO_CONFIGURATIONS))]
+        lora = [configuration.modem is RadioModem.LORA for configuration in configurations]
+
+        MODULATION_TABLE.update({
+            'lora': np.array(lora),
+            'sf': np.array([configuration.sf or 0 for configuration in configurations]),
+            'coderate': np.array([configuration.coderate or 0 for configuration in configurations]),
+            'low_data_rate': np.array([configuration.low_data_rate for configuration in configurations]),
+            'bitrate': np.array([configuration.bitrate for configuration in configurations], dtype=float),
+            'preamble_len': np.array([configuration.preamble_len for configuration in configurations]),
+            'sync_word_length': np.array([configuration.sync_word_length or 0 for configuration in configurations]),
+            'symbol_time': np.array([RadioMath(configuration).get_symbol_time() for configuration in configurations]),
+            'sensitivity': np.array([RadioMath(configuration).sensitivity for configuration in configurations]),
+        })
+        for values in MODULATION_TABLE.values():
+            values.flags.writeable = False
+    return MODULATION_TABLE
+
+
+def get_preamble_lengths(modulation, preamble_length=0):
+    modulation = np.asarray(modulation, dtype=np.int64)
+    preamble_length = np.asarray(preamble_length)
+    return np.where(preamble_length > 0, preamble_length, get_modulation_table()['preamble_len'][modulation])[()]
+
+
+def get_symbol_times(modulation):
+    return get_modulation_table()['symbol_time'][np.asarray(modulation, dtype=np.int64)]
+
+
+def get_preamble_times(modulation, preamble_length=0):
+    table = get_modulation_table()
+    modulation = np.asarray(modulation, dtype=np.int64)
+    preamble_length = get_preamble_lengths(modulation, preamble_length)
+
+    overhead = np.where(table['lora'][modulation], np.where(np.isin(table['sf'][modulation], [5, 6]), 6.25, 4.25), 0)
+    return table['symbol_time'][modulation] * (preamble_length + overhead)
+
+
+def get_message_toas(modulation, payload_size=0, preamble_length=0, sync=False, ceil_overhead=True):
+    table = get_modulation_table()
+    modulation = np.asarray(modulation, dtype=np.int64)
+    payload_size = np.asarray(payload_size)
+    preamble_length = get_preamble_lengths(modulation, preamble_length)
+    crc = 0 if sync else 1
+
+    sf = table['sf'][modulation]
+    coderate = table['coderate'][modulation] % 4 + 4
+    with np.errstate(divide='ignore', invalid='ignore'):  # FSK rows have no spreading factor
+        symbols = (8 * payload_size - 4 * sf + 28 + 16 * crc) / (4 * (sf - 2 * table['low_data_rate'][modulation]))
+    symbols = (np.ceil(symbols) if ceil_overhead else symbols) * coderate
+    lora_toa = (get_preamble_times(modulation, preamble_length)
+                + (8 + np.maximum(np.nan_to_num(symbols), 0)) * table['symbol_time'][modulation])
+
+    fsk_toa = 8 * (preamble_length + table['sync_word_length'][modulation] + 1.0 + payload_size
+                   + 2.0 * crc) / table['bitrate'][modulation]
+
+    return np.where(table['lora'][modulation], lora_toa, fsk_toa)[()]
+
+
+def get_sensitivities(modulation):
+    return get_modulation_table()['sensitivity'][np.asarray(modulation, dtype=np.int64)]
+
+
+def get_link_budgets(modulation, power=22):
+    return -(get_sensitivities(modulation) - np.asarray(power) + RF_SWITCH_INSERTION_LOSS)
+
+
+def get_tx_energies(modulation, payload_size=0, power=22, preamble_length=0):
+    return RadioConfiguration.tx_energy(power, get_message_toas(modulation, payload_size, preamble_length))
+
+
+def get_rx_energies(modulation, payload_size=0, preamble_length=0):
+    return RadioConfiguration.rx_energy(get_message_toas(modulation, payload_size, preamble_length))
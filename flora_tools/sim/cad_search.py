@@ -2,15 +2,53 @@ import flora_tools.gloria as gloria
 import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_event_manager as sim_event_manager
 import flora_tools.sim.sim_node as sim_node
-from flora_tools.radio_configuration import RadioConfiguration, RadioModem
+from flora_tools.radio_configuration import RadioConfiguration, RadioModem, get_radio_configuration
 from flora_tools.radio_math import RadioMath
 from flora_tools.sim.sim_message import SimMessage
 
 CAD_SYMBOL_TIMEOUT = [1, 1, 1]
 
+CAD_RX_SYMBOL_TIMEOUTS = []  # RX timeout per modulation, see get_rx_symbol_timeouts()
+CAD_SCAN_STEPS = []  # Steps of a full scan on an idle channel, see get_scan_steps()
+
+
+def get_rx_symbol_timeouts():
+    if not CAD_RX_SYMBOL_TIMEOUTS:
+        CAD_RX_SYMBOL_TIMEOUTS.extend(lwb_slot.LWBSlot.create_empty_slot(i, payload=255).total_time
+                                      for i in range(len(lwb_slot.RADIO_MODULATIONS)))
+    return CAD_RX_SYMBOL_TIMEOUTS
+
+
+def get_scan_steps():
+    # (modulation, setup time, remaining duration, listening time) in the order CADSearch scans the modulations.
+    # Each step ends at (start + setup time) + remaining duration, summed the same way as by the scan's events.
+    if not CAD_SCAN_STEPS:
+        for modulation in reversed(range(len(lwb_slot.RADIO_MODULATIONS))):
+            radio_config = get_radio_configuration(modulation=lwb_slot.RADIO_MODULATIONS[modulation])
+
+            if radio_config.modem is RadioModem.FSK:
+                timeout = get_rx_symbol_timeouts()[modulation]
+                CAD_SCAN_STEPS.append(
+                    (modulation, gloria.get_gloria_timings(lwb_slot.RADIO_MODULATIONS[modulation]).rx_setup_time,
+                     timeout, timeout))
+            else:
+                symbol_time = RadioMath(radio_config).get_symbol_time()
+                CAD_SCAN_STEPS.append(
+                    (modulation, gloria.get_gloria_timings(modulation).rx_setup_time,
+                     symbol_time * (CAD_SYMBOL_TIMEOUT[modulation] + 0.5), symbol_time))
+    return CAD_SCAN_STEPS
+
+
+def get_scan_duration():
+    timestamp = 0.0
+    for _, setup_time, duration, _ in get_scan_steps():
+        timestamp = timestamp + setup_time + duration
+    return timestamp
+
 
 class CADSearch:
-    def __init__(self, node: 'sim_node.SimNode', callback, start_modulation: int = None):
+    def __init__(self, node: 'sim_node.SimNode', callback, start_modulation: int = None,
+                 start_timestamp: float = None):
         self.node = node
         if start_modulation is not None:
             self.current_modulation = start_modulation + 1
@@ -22,6 +60,7 @@ class CADSearch:
         self.potential_message: SimMessage = None
         self.potential_node: sim_node.SimNode = None
         self.rx_timeout_event = None
+        self.start_timestamp = start_timestamp  # Resumes a fast-forwarded scan at a step that started in the past
 
         self.radio_config: RadioConfiguration = None
         self.radio_math: RadioMath = None
@@ -30,24 +69,30 @@ class CADSearch:
 
     @property
     def rx_symbol_timeout(self):
-        return [lwb_slot.LWBSlot.create_empty_slot(i, payload=255).total_time for i in range(len(lwb_slot.RADIO_MODULATIONS))]
+        return get_rx_symbol_timeouts()
 
     def process_next_mod(self):
         self.current_modulation -= 1
 
         if self.current_modulation >= 0:
-            self.radio_config = RadioConfiguration(modulation=lwb_slot.RADIO_MODULATIONS[self.current_modulation])
+            self.radio_config = get_radio_configuration(modulation=lwb_slot.RADIO_MODULATIONS[self.current_modulation])
             self.radio_math = RadioMath(self.radio_config)
 
+            if self.start_timestamp is not None:
+                timestamp = self.start_timestamp
+                self.start_timestamp = None
+            else:
+                timestamp = self.node.local_timestamp
+
             if self.radio_config.modem is RadioModem.FSK:
-                self.process_rx()
+                self.process_rx(timestamp)
             else:
-                self.process_lora_cad()
+                self.process_lora_cad(timestamp)
         else:
             self.callback(None)
 
-    def process_rx(self):
-        self.rx_start = self.node.local_timestamp + gloria.GloriaTimings(
+    def process_rx(self, timestamp: float):
+        self.rx_start = timestamp + gloria.get_gloria_timings(
             lwb_slot.RADIO_MODULATIONS[self.current_modulation]).rx_setup_time
         self.node.mm.register_rx(self.node,
                                  self.rx_start,
@@ -97,9 +142,9 @@ class CADSearch:
         else:
             self.process_next_mod()
 
-    def process_lora_cad(self):
+    def process_lora_cad(self, timestamp: float):
 
-        self.node.em.register_event(self.node.local_timestamp + gloria.GloriaTimings(
+        self.node.em.register_event(timestamp + gloria.get_gloria_timings(
             self.current_modulation).rx_setup_time + self.radio_math.get_symbol_time() * (
                                             CAD_SYMBOL_TIMEOUT[self.current_modulation] + 0.5),
                                     self.node,
@@ -111,6 +156,6 @@ class CADSearch:
                                             band=self.current_band,
                                             rx_node=self.node,
                                             timestamp=self.node.local_timestamp) is not None:
-            self.process_rx()
+            self.process_rx(self.node.local_timestamp)
         else:
             self.process_next_mod()
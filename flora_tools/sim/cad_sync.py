@@ -2,18 +2,22 @@ import logging
 
 import numpy as np
 
+import flora_tools.gloria as gloria
 import flora_tools.sim.cad_search as sim_cad_search
 import flora_tools.sim.sim_event_manager as sim_event_manager
 import flora_tools.sim.sim_node as sim_node
 from flora_tools import lwb_slot
+from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.sim.sim_logging import get_sim_logger
 from flora_tools.sim.sim_message import SimMessage, SimMessageType
+from flora_tools.sim.sim_tracer import CADActivity, Event, TraceEventType
 
 CAD_SYNC_MAX_BACKOFF_EXPONENT = 5  # 143.165576533 min
 
 
 class CADSync:
     def __init__(self, node: 'sim_node.SimNode'):
-        self.logger = logging.getLogger(self.__class__.__qualname__)
+        self.logger = get_sim_logger(self.__class__.__qualname__)
 
         self.node = node
         self.cad_scanner = None
@@ -22,6 +26,10 @@ class CADSync:
         self.start: float = None
         self.backoff_counter: int = -1
 
+        self.fast_forward_start: float = None
+        self.fast_forward_traced = None
+        self.fast_forward_event: sim_event_manager.SimEvent = None
+
     @property
     def backoff_period(self):
         return lwb_slot.LWB_SYNC_PERIOD
@@ -34,31 +42,131 @@ class CADSync:
         self.scan()
 
     def scan(self, modulation: int = None):
-        self.cad_scanner = sim_cad_search.CADSearch(self.node, self.scanner_callback, start_modulation=modulation)
+        if modulation is None and self.node.network.fast_forward_sync and not self.has_pending_transmissions():
+            self.fast_forward()
+        else:
+            self.cad_scanner = sim_cad_search.CADSearch(self.node, self.scanner_callback,
+                                                        start_modulation=modulation)
+
+    def has_pending_transmissions(self):
+        # Transmissions already in the store that a scan could still detect
+        network = self.node.network
+        for modulation in lwb_slot.RADIO_MODULATIONS:
+            transmissions = network.mm.mq.overlapping(network.global_timestamp, np.inf, modulation=modulation,
+                                                      band=gloria.DEFAULT_BAND)
+            if len(transmissions) and np.any(network.mc.get_reachable(modulation, self.node, transmissions)):
+                return True
+        return False
+
+    def fast_forward(self):
+        # Full scans of an idle channel are skipped. The node waits for the first transmission it could detect (or
+        # the end of the backoff period) and then resumes the scan at the step that is running at that moment.
+        self.fast_forward_start = self.node.local_timestamp
+        self.fast_forward_traced = (self.fast_forward_start, 0, 0.0)  # End, step count and listening time traced
+
+        duration = sim_cad_search.get_scan_duration()
+        scan_count = max(1, int(np.floor((self.start + self.backoff_period - self.fast_forward_start) / duration)) + 1)
+
+        time_limit = self.node.em.time_limit
+        if time_limit is not None:
+            # Hands back right after the time limit, so the skipped scans are traced up to the end of the simulation
+            limit = self.node.transform_global_to_local_timestamp(time_limit)
+            scan_count = min(scan_count, max(1, int(np.floor((limit - self.fast_forward_start) / duration)) + 1))
+
+        self.fast_forward_event = self.node.em.register_event(
+            self.fast_forward_start + scan_count * duration, self.node, sim_event_manager.SimEventType.GENERIC,
+            self.process_fast_forward_timeout)
+        self.node.mm.register_idle(self.node, lwb_slot.RADIO_MODULATIONS, gloria.DEFAULT_BAND,
+                                   self.process_fast_forward_wakeup, self.trace_fast_forward)
+
+    def get_fast_forward_progress(self, timestamp: float):
+        # Step running at the timestamp, with its start as well as the number and listening time of the steps before
+        steps = sim_cad_search.get_scan_steps()
+        duration = sim_cad_search.get_scan_duration()
+
+        scan_count = int((timestamp - self.fast_forward_start) // duration)
+        step_start = self.fast_forward_start + scan_count * duration
+        step_count = scan_count * len(steps)
+        listening_time = scan_count * sum(step[3] for step in steps)
+
+        for modulation, setup_time, step_duration, listening in steps:
+            step_end = step_start + setup_time + step_duration
+            if step_end >= timestamp:
+                return modulation, step_start, step_count, listening_time
+            step_start = step_end
+            step_count += 1
+            listening_time += listening
+
+        return steps[0][0], step_start, step_count, listening_time  # Rounding, the next scan just started
+
+    def process_fast_forward_timeout(self, event):
+        self.node.mm.unregister_idle(self.node)
+        self.fast_forward_event = None
+
+        steps = sim_cad_search.get_scan_steps()
+        scan_count = int(round((self.node.local_timestamp - self.fast_forward_start)
+                               / sim_cad_search.get_scan_duration()))
+        self.trace_fast_forward_steps(self.node.local_timestamp, scan_count * len(steps),
+                                      scan_count * sum(step[3] for step in steps))
+
+        self.scanner_callback(None)
+
+    def process_fast_forward_wakeup(self):
+        if self.node.local_timestamp >= self.fast_forward_event.local_timestamp:
+            return  # The scan ends at this moment anyway
+
+        self.node.mm.unregister_idle(self.node)
+        self.node.em.unregister_event(self.fast_forward_event)
+        self.fast_forward_event = None
+
+        modulation, step_start, step_count, listening_time = self.get_fast_forward_progress(
+            self.node.local_timestamp)
+        self.trace_fast_forward_steps(step_start, step_count, listening_time)
+
+        self.cad_scanner = sim_cad_search.CADSearch(self.node, self.scanner_callback, start_modulation=modulation,
+                                                    start_timestamp=step_start)
+
+    def trace_fast_forward(self):
+        # Traces the steps skipped so far while the scan stays fast-forwarded, e.g. when the simulation stops
+        _, step_start, step_count, listening_time = self.get_fast_forward_progress(self.node.local_timestamp)
+        self.trace_fast_forward_steps(step_start, step_count, listening_time)
+
+    def trace_fast_forward_steps(self, end: float, step_count: int, listening_time: float):
+        traced_end, traced_step_count, traced_listening_time = self.fast_forward_traced
+
+        if step_count > traced_step_count:
+            self.node.network.tracer.log_activity(
+                CADActivity(self.node.transform_local_to_global_timestamp(traced_end),
+                            self.node.transform_local_to_global_timestamp(end), self.node,
+                            RadioConfiguration.rx_energy(listening_time - traced_listening_time), None, False,
+                            scan_count=step_count - traced_step_count))
+            self.fast_forward_traced = (end, step_count, listening_time)
 
     def scanner_callback(self, message: SimMessage):
         if message is not None:
             self.start = self.node.local_timestamp
             self.backoff_counter = -1
 
-            self.logger.info(
-                "Marker:{:10f}\tNode:{:3d}\tTx_End:{:10f}\tMod:{:2d}\tType:{:16s}".format(self.node.local_timestamp,
-                                                                                          self.node.id,
-                                                                                          message.tx_end,
-                                                                                          message.modulation,
-                                                                                          message.type))
+            if self.logger.is_enabled(logging.INFO):
+                self.logger.info(
+                    "Marker:%(marker)10f\tNode:%(node)3d\tTx_End:%(tx_end)10f\tMod:%(modulation)2d\tType:%(type)-16s",
+                    marker=self.node.local_timestamp, node=self.node.id, tx_end=message.tx_end,
+                    modulation=message.modulation, type=message.type)
 
             if message.type is SimMessageType.SYNC:
                 self.node.lwb.schedule_manager.register_sync(message)
                 self.sync_timestamp(message)
+                self.log_sync()
                 self.callback()
             elif message.type is SimMessageType.SLOT_SCHEDULE:
                 self.node.lwb.schedule_manager.register_slot_schedule(message)
                 self.sync_timestamp(message)
+                self.log_sync()
                 self.callback()
             elif message.type is SimMessageType.ROUND_SCHEDULE:
                 self.node.lwb.schedule_manager.register_round_schedule(message)
                 self.sync_timestamp(message)
+                self.log_sync()
                 self.callback()
             else:
                 self.scan(modulation=message.modulation)
@@ -75,5 +183,8 @@ class CADSync:
             else:
                 self.scan()
 
+    def log_sync(self):
+        self.node.network.tracer.log_event(Event(TraceEventType.SYNC, self.node.network.global_timestamp, self.node))
+
     def sync_timestamp(self, message: SimMessage):
         self.node.local_timestamp = message.timestamp + message.tx_end - message.tx_start
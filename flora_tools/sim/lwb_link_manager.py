@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 import flora_tools.lwb_slot as lwb_slot
@@ -6,43 +7,103 @@ import flora_tools.sim.sim_node as sim_node
 LWB_LINK_UPGRADE_COUNTER = 2
 LWB_LINK_DOWNGRADE_COUNTER = 1
 
+LINK_COLUMNS = ['modulation', 'power_level', 'counter', 'hop_count']
+MODULATION, POWER_LEVEL, COUNTER, HOP_COUNT = range(len(LINK_COLUMNS))
+NO_HOP_COUNT = -1
+
+
+class LWBLink:
+    __slots__ = ('id', 'modulation', 'power_level', 'counter', 'hop_count')
+
+    def __init__(self, id: int, modulation: int, power_level: int, counter: int, hop_count: int = None):
+        self.id = id
+        self.modulation = modulation
+        self.power_level = power_level
+        self.counter = counter
+        self.hop_count = hop_count
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __str__(self):
+        return "<LWBLink {},{},{},{},{}>".format(self.id, self.modulation, self.power_level, self.counter,
+                                                 self.hop_count)
+
 
 class LWBLinkManager:
     def __init__(self, node: 'sim_node.SimNode'):
         self.node = node
 
-        self.links = pd.DataFrame(columns=['modulation', 'power_level', 'counter', 'hop_count'])
-        self.links.index.name = 'id'
+        # Rows are indexed by the target node id, columns as in LINK_COLUMNS
+        self.links = np.zeros((0, len(LINK_COLUMNS)), dtype=np.int64)
+        self.valid = np.zeros(0, dtype=bool)
+
+    def __contains__(self, target_node: 'sim_node.SimNode'):
+        return target_node.id < len(self.valid) and bool(self.valid[target_node.id])
+
+    def reserve(self, id: int):
+        if id >= len(self.valid):
+            size = max(id + 1, 2 * len(self.valid))
+
+            links = np.zeros((size, len(LINK_COLUMNS)), dtype=np.int64)
+            links[:len(self.links)] = self.links
+            valid = np.zeros(size, dtype=bool)
+            valid[:len(self.valid)] = self.valid
+
+            self.links = links
+            self.valid = valid
+
+    def set_link(self, id: int, modulation: int, power_level: int, counter: int, hop_count: int = None):
+        self.reserve(id)
+        self.links[id] = [modulation, power_level, counter, (hop_count if hop_count is not None else NO_HOP_COUNT)]
+        self.valid[id] = True
 
     def upgrade_link(self, target_node: 'sim_node.SimNode', modulation: int, power_level: int, hop_count: int = None):
-        if target_node.id in self.links.index:
-            current_link = self.links.loc[target_node.id, :]
+        if target_node in self:
+            current_link = self.links[target_node.id]
 
-            if modulation > current_link['modulation'] or (
-                    modulation == current_link['modulation'] and power_level < current_link['power_level']):
-                if current_link['counter'] <= 0:
-                    self.links[target_node.id] = [modulation, power_level, LWB_LINK_UPGRADE_COUNTER, hop_count]
+            if modulation > current_link[MODULATION] or (
+                    modulation == current_link[MODULATION] and power_level < current_link[POWER_LEVEL]):
+                if current_link[COUNTER] <= 0:
+                    self.set_link(target_node.id, modulation, power_level, LWB_LINK_UPGRADE_COUNTER, hop_count)
+                    self.node.lwb.stream_manager.update_master(target_node)
                     self.node.lwb.stream_manager.retry_all_streams()
                 else:
-                    self.links.loc[target_node.id, 'counter'] -= 1
+                    current_link[COUNTER] -= 1
 
         else:
-            self.links.loc[target_node.id, :] = [modulation, power_level, LWB_LINK_UPGRADE_COUNTER, hop_count]
+            self.set_link(target_node.id, modulation, power_level, LWB_LINK_UPGRADE_COUNTER, hop_count)
+            self.node.lwb.stream_manager.update_master(target_node)
 
     def downgrade_link(self, target_node: 'sim_node.SimNode'):
-        if target_node.id in self.links.index:
-            self.links[target_node.id, 'counter'] += 1
-            if self.links[target_node.id, 'counter'] > LWB_LINK_DOWNGRADE_COUNTER:
-                if self.links[target_node.id, 'power_level'] < len(lwb_slot.RADIO_POWERS) - 1:
-                    self.links[target_node.id] = [self.links[target_node.id, 'modulation'],
-                                                  self.links[target_node.id, 'power_level'] + 1, 0]
+        if target_node in self:
+            current_link = self.links[target_node.id]
+
+            current_link[COUNTER] += 1
+            if current_link[COUNTER] > LWB_LINK_DOWNGRADE_COUNTER:
+                if current_link[POWER_LEVEL] < len(lwb_slot.RADIO_POWERS) - 1:
+                    # Increase the power level first
+                    current_link[POWER_LEVEL] += 1
+                    current_link[COUNTER] = 0
+                elif current_link[MODULATION] > 0:
+                    # Then fall back to the next more robust modulation
+                    current_link[MODULATION] -= 1
+                    current_link[COUNTER] = 0
+                    self.node.lwb.stream_manager.update_master(target_node)
                 else:
-                    if self.links[target_node.id, 'modulation'] > 0:
-                        self.links[target_node.id] = [self.links[target_node.id, 'modulation'] - 1,
-                                                      self.links[target_node.id, 'power_level'] + 1, 0]
-                    else:
-                        self.links = self.links.drop(id)
-
-    def get_link(self, target_node: 'sim_node.SimNode'):
-        link = self.links.loc[target_node.id]
-        return link
+                    self.valid[target_node.id] = False
+                    self.node.lwb.stream_manager.update_master(target_node)
+
+    def get_link(self, target_node: 'sim_node.SimNode') -> LWBLink:
+        if target_node not in self:
+            raise KeyError(target_node.id)
+
+        modulation, power_level, counter, hop_count = self.links[target_node.id].tolist()
+        return LWBLink(target_node.id, modulation, power_level, counter,
+                       (hop_count if hop_count != NO_HOP_COUNT else None))
+
+    def to_frame(self) -> pd.DataFrame:
+        ids = np.flatnonzero(self.valid)
+        links = pd.DataFrame(self.links[ids], index=pd.Index(ids, name='id'), columns=LINK_COLUMNS)
+        links['hop_count'] = links['hop_count'].astype(object).where(links['hop_count'] != NO_HOP_COUNT, None)
+        return links
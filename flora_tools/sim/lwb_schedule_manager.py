@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Union
 
 import numpy as np
 
@@ -45,7 +45,8 @@ class LWBScheduleManager:
     def __init__(self, node: 'sim_node.SimNode'):
         self.node = node
 
-        self.next_rounds: List[lwb_round.LWBRound] = [None] * len(lwb_slot.RADIO_MODULATIONS)
+        # Planned rounds, only the next round to run gets built, see get_next_round()
+        self.next_rounds: List[lwb_round.LWBRoundPlan] = [None] * len(lwb_slot.RADIO_MODULATIONS)
 
         self.last_sync: float = 0
 
@@ -66,14 +67,14 @@ class LWBScheduleManager:
             self.stream_request_layout[modulation] -= 1
 
     def generate_initial_schedule(self):
-        sync_round: lwb_round.LWBRound = lwb_round.LWBRound.create_sync_round(self.get_next_epoch(),
-                                                                              0,
-                                                                              self.node)
+        sync_round: lwb_round.LWBRoundPlan = lwb_round.LWBRoundPlan.create_sync_round(self.get_next_epoch(),
+                                                                                      0,
+                                                                                      self.node)
         self.last_sync: float = 0
         self.next_rounds[0] = sync_round
 
     def get_next_round(self):
-        sorted_next_rounds: List[lwb_round.LWBRound] = sorted(
+        sorted_next_rounds: List[lwb_round.LWBRoundPlan] = sorted(
             [round for round in self.next_rounds if
              round is not None],
             key=lambda x: x.round_marker)
@@ -81,7 +82,7 @@ class LWBScheduleManager:
         if len(sorted_next_rounds):
             round = sorted_next_rounds[0]
             self.next_rounds[round.modulation] = None
-            return round
+            return round.build()
         else:
             return None
 
@@ -93,11 +94,12 @@ class LWBScheduleManager:
         return self.next_rounds.copy()
 
     def register_round_schedule(self, message: 'sim_message.SimMessage'):
-        schedule: List[lwb_round.LWBRound] = message.content.copy()
+        schedule: List[lwb_round.LWBRoundPlan] = message.content.copy()
         for round in schedule:
             if round is not None:
                 layout = round.layout[0:1]
-                empty_round = lwb_round.LWBRound(round.round_marker, round.modulation, round.type, round.master, layout)
+                empty_round = lwb_round.LWBRoundPlan(round.round_marker, round.modulation, round.type, round.master,
+                                                     layout)
                 self.next_rounds[round.modulation] = empty_round
 
         self.node.lwb.base = message.source
@@ -134,7 +136,8 @@ class LWBScheduleManager:
             if self.next_rounds[i] is not None:
                 if (self.next_rounds[i].round_marker > last_epoch
                         and self.stream_request_layout[i] > 0):
-                    round = lwb_round.LWBRound.create_stream_request_round(last_epoch, i, self.stream_request_layout[i])
+                    round = lwb_round.LWBRoundPlan.create_stream_request_round(last_epoch, i,
+                                                                               self.stream_request_layout[i])
                 else:
                     round = self.next_rounds[i]
             else:
@@ -142,7 +145,7 @@ class LWBScheduleManager:
                     self.get_next_epoch(last_round), lwb_round.LWB_MAX_SLOT_COUNT[i], i)
 
                 if len(notification_schedule):
-                    round = lwb_round.LWBRound.create_notification_round(last_epoch, i, notification_schedule)
+                    round = lwb_round.LWBRoundPlan.create_notification_round(last_epoch, i, notification_schedule)
                 else:
                     if len(self.node.lwb.stream_manager.datastreams):
                         data_schedule = self.node.lwb.stream_manager.schedule_data(
@@ -160,10 +163,10 @@ class LWBScheduleManager:
                                     power_level=self.node.lwb.link_manager.get_link(stream.master)['power_level'],
                                     ack_power_level=stream.advertised_ack_power_level))
 
-                        round = lwb_round.LWBRound.create_data_round(last_epoch, i, data_slots, self.node)
+                        round = lwb_round.LWBRoundPlan.create_data_round(last_epoch, i, data_slots, self.node)
                     elif self.stream_request_layout[i] > 0:
-                        round = lwb_round.LWBRound.create_stream_request_round(last_epoch, i,
-                                                                               self.stream_request_layout[i], self.node)
+                        round = lwb_round.LWBRoundPlan.create_stream_request_round(
+                            last_epoch, i, self.stream_request_layout[i], self.node)
                     else:
                         condense = False
                         next_time, stream_type = self.node.lwb.stream_manager.get_next_round_schedule_timestamp(i)
@@ -173,8 +176,8 @@ class LWBScheduleManager:
                                     self.get_next_epoch(next_time), lwb_round.LWB_MAX_SLOT_COUNT[i], i)
 
                                 if len(notification_schedule):
-                                    round = lwb_round.LWBRound.create_notification_round(next_time, i,
-                                                                                         notification_schedule)
+                                    round = lwb_round.LWBRoundPlan.create_notification_round(next_time, i,
+                                                                                             notification_schedule)
                             else:
                                 if len(self.node.lwb.stream_manager.datastreams):
                                     data_schedule = self.node.lwb.stream_manager.schedule_data(next_time,
@@ -195,17 +198,18 @@ class LWBScheduleManager:
                                                     'power_level'],
                                                 ack_power_level=stream.advertised_ack_power_level))
 
-                                    round = lwb_round.LWBRound.create_data_round(next_time, i, data_slots, self.node)
+                                    round = lwb_round.LWBRoundPlan.create_data_round(next_time, i, data_slots,
+                                                                                     self.node)
                         else:
                             if i is 0:
                                 next_sync = last_epoch + np.ceil(
                                     (last_epoch - self.last_sync) / lwb_slot.LWB_SYNC_PERIOD) * lwb_slot.LWB_SYNC_PERIOD
-                                round = lwb_round.LWBRound.create_sync_round(next_sync, i, self.node)
+                                round = lwb_round.LWBRoundPlan.create_sync_round(next_sync, i, self.node)
                                 self.last_sync = next_sync
                             else:
                                 continue
 
-            interfering_rounds: List[lwb_round.LWBRound] = sorted(
+            interfering_rounds: List[lwb_round.LWBRoundPlan] = sorted(
                 [interfering_round for interfering_round in self.next_rounds[0:current_round.modulation] if
                  interfering_round is not None], key=lambda x: x.round_marker)
 
@@ -237,7 +241,7 @@ class LWBScheduleManager:
             if round is not None:
                 last_round = round
 
-    def get_next_epoch(self, round: 'lwb_round.LWBRound' = None):
+    def get_next_epoch(self, round: 'Union[lwb_round.LWBRound, lwb_round.LWBRoundPlan]' = None):
         if round is None:
             return 0
         else:
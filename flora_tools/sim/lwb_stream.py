@@ -1,3 +1,4 @@
+import heapq
 from copy import copy
 from typing import List, Union, Tuple, Optional
 
@@ -15,6 +16,9 @@ LWB_STREAM_DEACTIVATION_BACKOFF = 100
 LWB_STREAM_MAX_BACKOFF_RANGE = 16
 LWB_STREAM_INITIAL_BACKOFF_RANGE = 4
 
+LWB_STREAM_INDEX_MARGIN = 1E-6  # Streams due up to this much later are still checked exactly by available()
+LWB_STREAM_INDEX_MIN_STALE = 64  # Invalidated heap entries tolerated before the heaps get compacted
+
 
 class DataStream:
     def __init__(self, id: str, node: 'sim_node.SimNode', master: 'sim_node.SimNode', priority, subpriority, period,
@@ -61,6 +65,8 @@ class DataStream:
     @last_consumption.setter
     def last_consumption(self, value):
         self._last_consumption = value
+        if self.stream_manager is not None:
+            self.stream_manager.update(self)
 
     def schedule_slot(self, timestamp):
         if self.current_slot < self.slot_count - 1:
@@ -181,7 +187,7 @@ class NotificationStream:
         self.needs_ack = needs_ack
 
         self.stream_manager: LWBStreamManager = None
-        self.last_consumption = self.node.local_timestamp - self.period
+        self._last_consumption = self.node.local_timestamp - self.period
         self.ttl = LWB_STREAM_MAX_TTL
         self.is_ack = True
 
@@ -192,6 +198,16 @@ class NotificationStream:
 
         self.advertised_ack_power_level = None  # Modulation not needed, as it is implicated by the stream request handshake
 
+    @property
+    def last_consumption(self):
+        return self._last_consumption
+
+    @last_consumption.setter
+    def last_consumption(self, value):
+        self._last_consumption = value
+        if self.stream_manager is not None:
+            self.stream_manager.update(self)
+
     def check_request(self, round: 'lwb_round.LWBRound', modulation: int) -> bool:
         if not self.backoff:
             self.backoff = np.random.choice(range(self.backoff_range))
@@ -278,12 +294,132 @@ class NotificationStream:
         self.stream_manager.register_notification(self)
 
 
+class LWBStreamIndex:
+    # Streams without a service (i.e. the ones registered at the base) are only available once their next period
+    # has passed. They are kept in one heap of [next_period, sequence, version, stream] entries per (link modulation,
+    # low power) bucket, so due streams and the next period of a modulation are found without scanning every stream.
+    # Entries of updated or removed streams are invalidated in place and dropped lazily.
+    def __init__(self, node: 'sim_node.SimNode'):
+        self.node = node
+
+        self.buckets = {}  # (modulation, low_power) -> heap of entries
+        self.entries = {}  # stream -> its valid heap entry
+        self.masters = {}  # master node -> {stream: None}, to rebucket the streams on link changes
+        self.service_streams = {}  # stream -> sequence, their availability is up to the service
+        self.sequence = 0  # Registration order, i.e. the order of the stream manager lists
+        self.version = 0  # Distinguishes the entries of a stream from its invalidated ones
+        self.stale_count = 0
+
+    def get_bucket_key(self, stream: Union[DataStream, NotificationStream]):
+        try:
+            modulation = self.node.lwb.link_manager.get_link(stream.master)['modulation']
+        except KeyError:
+            modulation = None
+        return modulation, getattr(stream, 'low_power', False)
+
+    def add(self, stream: Union[DataStream, NotificationStream]):
+        sequence = self.sequence
+        self.sequence += 1
+
+        if stream.service is not None:
+            self.service_streams[stream] = sequence
+        else:
+            self.push(stream, sequence)
+            self.masters.setdefault(stream.master, {})[stream] = None
+
+    def push(self, stream: Union[DataStream, NotificationStream], sequence: int):
+        entry = [stream.next_period, sequence, self.version, stream]
+        self.version += 1
+        self.entries[stream] = entry
+        heapq.heappush(self.buckets.setdefault(self.get_bucket_key(stream), []), entry)
+
+    def invalidate(self, stream: Union[DataStream, NotificationStream]):
+        entry = self.entries.pop(stream, None)
+        if entry is not None:
+            entry[3] = None
+            self.stale_count += 1
+        return entry
+
+    def discard(self, stream: Union[DataStream, NotificationStream]):
+        self.service_streams.pop(stream, None)
+
+        if self.invalidate(stream) is not None:
+            streams = self.masters[stream.master]
+            del streams[stream]
+            if not streams:
+                del self.masters[stream.master]
+            self.compact()
+
+    def update(self, stream: Union[DataStream, NotificationStream]):
+        entry = self.invalidate(stream)
+        if entry is not None:
+            self.push(stream, entry[1])
+            self.compact()
+
+    def update_master(self, master: 'sim_node.SimNode'):
+        for stream in list(self.masters.get(master, {})):
+            self.update(stream)
+
+    def compact(self):
+        if self.stale_count > len(self.entries) + LWB_STREAM_INDEX_MIN_STALE:
+            for heap in self.buckets.values():
+                heap[:] = [entry for entry in heap if entry[3] is not None]
+                heapq.heapify(heap)
+            self.stale_count = 0
+
+    def get_due(self, timestamp) -> List[Union[DataStream, NotificationStream]]:
+        threshold = timestamp + LWB_STREAM_INDEX_MARGIN
+        due = []
+
+        for heap in self.buckets.values():
+            # Only the subtrees of entries that are due can contain further due entries
+            stack = [0] if heap else []
+            while stack:
+                position = stack.pop()
+                entry = heap[position]
+                if entry[0] <= threshold:
+                    if entry[3] is not None:
+                        due.append((entry[1], entry[3]))
+                    for child in (2 * position + 1, 2 * position + 2):
+                        if child < len(heap):
+                            stack.append(child)
+
+        due.extend((sequence, stream) for stream, sequence in self.service_streams.items())
+        due.sort(key=lambda item: item[0])
+        return [stream for sequence, stream in due]
+
+    def get_first(self, modulation: int, low_power: bool = None):
+        first = None
+
+        for key in [(modulation, False), (modulation, True)]:
+            if low_power is not None and key[1] is not low_power:
+                continue
+
+            heap = self.buckets.get(key)
+            while heap and heap[0][3] is None:
+                heapq.heappop(heap)
+                self.stale_count -= 1
+            if heap and (first is None or heap[0][0:2] < first[0:2]):
+                first = heap[0]
+
+        for stream, sequence in self.service_streams.items():
+            if ((low_power is None or getattr(stream, 'low_power', False) is low_power)
+                    and self.get_bucket_key(stream)[0] == modulation
+                    and (first is None or [stream.next_period, sequence] < first[0:2])):
+                first = [stream.next_period, sequence, None, stream]
+
+        return first[3] if first is not None else None
+
+
 class LWBStreamManager:
     def __init__(self, node: 'sim_node.SimNode'):
         self.node = node
         self.datastreams: List[DataStream] = []
         self.notification_streams: List[NotificationStream] = []
 
+        self.data_index = LWBStreamIndex(self.node)
+        self.notification_index = LWBStreamIndex(self.node)
+
     def register(self, stream: Union[DataStream, NotificationStream]):
         if stream.service is None:
             stream.is_ack = True
@@ -300,11 +436,14 @@ class LWBStreamManager:
         for item in self.datastreams:
             if item.id == datastream.id:
                 self.datastreams.remove(item)
+                self.data_index.discard(item)
 
         self.datastreams.append(datastream)
+        self.data_index.add(datastream)
 
     def remove_data(self, datastream: DataStream):
         self.datastreams.remove(datastream)
+        self.data_index.discard(datastream)
 
     def register_notification(self, notification_stream: NotificationStream):
         notification_stream.node = self.node
@@ -312,15 +451,29 @@ class LWBStreamManager:
         for item in self.notification_streams:
             if item.id == notification_stream.id:
                 self.datastreams.remove(item)
+                self.data_index.discard(item)
 
         self.datastreams.append(notification_stream)
+        self.data_index.add(notification_stream)
 
     def remove_notification(self, notification_stream: NotificationStream):
         self.notification_streams.remove(notification_stream)
+        self.notification_index.discard(notification_stream)
+
+    def update(self, stream: Union[DataStream, NotificationStream]):
+        self.data_index.update(stream)
+        self.notification_index.update(stream)
+
+    def update_master(self, master: 'sim_node.SimNode'):
+        self.data_index.update_master(master)
+        self.notification_index.update_master(master)
 
     def select_data(self, slot_size: int = None, selection: List[DataStream] = None, timestamp=None):
         if selection is None:
-            selection = self.datastreams.copy()
+            if timestamp is not None:
+                selection = self.data_index.get_due(timestamp)
+            else:
+                selection = self.datastreams.copy()
 
         best_match: DataStream = None
 
@@ -353,7 +506,10 @@ class LWBStreamManager:
 
     def select_notification(self, selection: List[NotificationStream] = None, low_power=False, timestamp=None):
         if selection is None:
-            selection = self.notification_streams
+            if timestamp is not None:
+                selection = self.notification_index.get_due(timestamp)
+            else:
+                selection = self.notification_streams
 
         best_match: NotificationStream = None
         stream: NotificationStream
@@ -369,7 +525,7 @@ class LWBStreamManager:
         return best_match
 
     def schedule_data(self, timestamp, slot_count: int, modulation: int):
-        selection = self.datastreams.copy()
+        selection = self.data_index.get_due(timestamp)
         streams: List[DataStream] = []
         count = 0
 
@@ -391,12 +547,12 @@ class LWBStreamManager:
         return streams
 
     def schedule_notification(self, timestamp, slot_count: int, modulation: int):
-        selection = self.notification_streams.copy()
+        selection = self.notification_index.get_due(timestamp)
         streams: List[NotificationStream] = []
         count = 0
 
         while count < slot_count:
-            stream = self.select_notification(selection=selection)
+            stream = self.select_notification(selection=selection, timestamp=timestamp)
             if (stream is not None
                     and self.node.lwb.link_manager.get_link(stream.master)['modulation'] == modulation
                     and stream.priority <= modulation):
@@ -510,30 +666,16 @@ class LWBStreamManager:
                 return
 
     def get_next_round_schedule_timestamp(self, modulation):
-        next_period: int = None
-        stream_type = None
+        stream = self.data_index.get_first(modulation)
+        notification_stream = self.notification_index.get_first(modulation, low_power=False)
 
-        for stream in self.datastreams:
-            if self.node.lwb.link_manager.get_link(stream.master)['modulation'] is modulation:
-                if next_period is None:
-                    next_period = stream.next_period
-                    stream_type = type(stream)
-                elif stream.next_period < next_period:
-                    next_period = stream.next_period
-                    stream_type = type(stream)
-
-        for stream in self.notification_streams:
-            if (not stream.low_power and
-                    self.node.lwb.link_manager.get_link(stream.master)['modulation'] is modulation):
-                if next_period is None:
-                    next_period = stream.next_period
-                    stream_type = type(stream)
-                elif stream.next_period < next_period:
-                    next_period = stream.next_period
-                    stream_type = type(stream)
+        if notification_stream is not None and (
+                stream is None or notification_stream.next_period < stream.next_period):
+            stream = notification_stream
 
-        if next_period is not None:
-            return np.ceil(next_period / lwb_slot.LWB_SCHEDULE_GRANULARITY) * lwb_slot.LWB_SCHEDULE_GRANULARITY, stream_type
+        if stream is not None:
+            granularity = lwb_slot.LWB_SCHEDULE_GRANULARITY
+            return np.ceil(stream.next_period / granularity) * granularity, type(stream)
         else:
             return None, None
 
@@ -1,13 +1,39 @@
+from flora_tools.sim.sim_event_manager import EventHistoryPolicy
 from flora_tools.sim.sim_network import SimNetwork
+from flora_tools.sim.sim_profiler import SimProfiler
 
 
 class Sim:
-    def __init__(self, output_path=None, event_count: int = None, time_limit: float = None, seed: int = 0):
+    def __init__(self, output_path=None, event_count: int = None, time_limit: float = None, seed: int = 0,
+                 node_count: int = 5, path_loss=[90, 140], flocklab: bool = False, snapshot=None,
+                 profile: bool = False, event_history: EventHistoryPolicy = EventHistoryPolicy.RING,
+                 spatial: bool = False, dimensions: int = 2, fast_forward_sync: bool = False):
         if event_count is None and time_limit is None:
             event_count = 1000
 
-        self.network = SimNetwork(output_path, event_count=event_count, time_limit=time_limit, seed=seed)
+        if snapshot is not None:
+            # Resumes (or forks) the snapshot's network, the topology arguments are ignored
+            self.network = SimNetwork.load_snapshot(snapshot, output_path, event_count=event_count,
+                                                    time_limit=time_limit)
+            self.network.fast_forward_sync = fast_forward_sync
+        else:
+            self.network = SimNetwork(output_path, node_count=node_count, event_count=event_count,
+                                      time_limit=time_limit, path_loss=path_loss, seed=seed, flocklab=flocklab,
+                                      event_history=event_history, spatial=spatial, dimensions=dimensions,
+                                      fast_forward_sync=fast_forward_sync)
+
+        if profile:
+            self.network.em.profiler = SimProfiler(self.network)
 
     def run(self):
         self.network.run()
         self.network.tracer.store()
+
+        profiler = self.network.em.profiler
+        if profiler is not None:
+            profiler.print_summary()
+            if self.network.tracer.output_path is not None:
+                profiler.export(self.network.tracer.output_path)
+
+    def save_snapshot(self, path):
+        self.network.save_snapshot(path)
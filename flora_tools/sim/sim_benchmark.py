@@ -0,0 +1,347 @@
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import flora_tools
+import flora_tools.gloria as gloria
+import flora_tools.lwb_round as lwb_round
+import flora_tools.lwb_slot as lwb_slot
+from flora_tools.radio_configuration import RadioConfiguration, RADIO_CONFIGURATIONS
+from flora_tools.radio_math import RadioMath
+from flora_tools.sim.sim import Sim
+from flora_tools.sim.sim_logging import set_sim_log_level
+from flora_tools.sim.sim_network import SimNetwork
+from flora_tools.sim.sim_options import BENCHMARK_REPEAT
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows, the peak RSS is not recorded there
+
+BENCHMARK_NODE_COUNTS = [5, 20, 50, 200]
+BENCHMARK_EVENT_COUNT = 5000  # Events of the fixed-length event loop and of each full simulation run
+BENCHMARK_MIN_TIME = 0.2  # Minimum duration of a timed call, short operations are called repeatedly [s]
+BENCHMARK_PATH_LOSS = [90, 140]
+BENCHMARK_CHANNEL_NODE_COUNT = 50
+BENCHMARK_CHANNEL_TRANSMISSIONS = 10000  # Transmissions in the store queried by the channel benchmark
+BENCHMARK_CHANNEL_QUERIES = 2000
+BENCHMARK_ROUND_DATA_SLOTS = 8
+BENCHMARK_FILE = "benchmark.json"
+BENCHMARK_REGRESSION_THRESHOLD = 0.9  # Throughput ratio to the baseline below which a benchmark counts as regressed
+BENCHMARK_LOG_LEVEL = 'WARNING'  # Keeps the per-event INFO logging out of the measurements
+# Packages only some subcommands need, the CLI must start without importing them
+CLI_LAZY_MODULES = ['flask', 'serial', 'stm32loader', 'intelhex', 'matplotlib', 'pandas']
+CLI_STARTUP_SCRIPT = '''
+import runpy
+import sys
+
+sys.argv = ['flora_tools', '--help']
+try:
+    runpy.run_module('flora_tools', run_name='__main__')
+except SystemExit:
+    pass
+print(' '.join(sys.modules), file=sys.stderr)
+'''
+
+
+def get_peak_rss():
+    # Peak resident set size of this process [byte]
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if platform.system() == 'Darwin' else peak_rss * 1024
+
+
+# Every setup function prepares a benchmark and returns the operation to time together with the number of
+# operations it performs per call. The operation returns the number of processed simulation events, if any.
+
+def setup_message_toa(node_count=None, event_count=None, seed=0):
+    maths = [RadioMath(RadioConfiguration(modulation)) for modulation in range(len(RADIO_CONFIGURATIONS))]
+    payloads = range(0, 256, 8)
+
+    def run():
+        for math in maths:
+            for payload in payloads:
+                math.get_message_toa(payload_size=payload)
+
+    return run, len(maths) * len(payloads)
+
+
+def setup_gloria_flood(node_count=None, event_count=None, seed=0):
+    floods = [gloria.GloriaFlood(None, modulation, lwb_slot.LWB_MAX_DATA_PAYLOAD,
+                                 lwb_slot.GLORIA_RETRANSMISSIONS_COUNTS[modulation],
+                                 lwb_slot.GLORIA_HOP_COUNTS[modulation], is_ack=acked)
+              for modulation in range(len(RADIO_CONFIGURATIONS)) for acked in [False, True]]
+
+    def run():
+        for flood in floods:
+            flood.generate()
+
+    return run, len(floods)
+
+
+def setup_lwb_round(node_count=None, event_count=None, seed=0):
+    data_slots = [lwb_round.LWBDataSlotItem(data_payload=lwb_slot.LWB_MAX_DATA_PAYLOAD, power_level=0,
+                                            ack_power_level=0) for _ in range(BENCHMARK_ROUND_DATA_SLOTS)]
+    modulations = range(len(lwb_slot.RADIO_MODULATIONS))
+
+    def run():
+        for modulation in modulations:
+            lwb_round.LWBRound.create_sync_round(0, modulation)
+            lwb_round.LWBRound.create_data_round(0, modulation, data_slots)
+            lwb_round.LWBRound.create_stream_request_round(0, modulation, BENCHMARK_ROUND_DATA_SLOTS)
+            lwb_round.LWBRound.create_notification_round(0, modulation, data_slots)
+            lwb_round.LWBRound.create_lp_notification_round(0, modulation, BENCHMARK_ROUND_DATA_SLOTS)
+
+    return run, 5 * len(modulations)
+
+
+def setup_lwb_round_plan(node_count=None, event_count=None, seed=0):
+    # The same rounds as planned by the schedule manager, without building their slots
+    data_slots = [lwb_round.LWBDataSlotItem(data_payload=lwb_slot.LWB_MAX_DATA_PAYLOAD, power_level=0,
+                                            ack_power_level=0) for _ in range(BENCHMARK_ROUND_DATA_SLOTS)]
+    modulations = range(len(lwb_slot.RADIO_MODULATIONS))
+
+    def run():
+        for modulation in modulations:
+            lwb_round.LWBRoundPlan.create_sync_round(0, modulation)
+            lwb_round.LWBRoundPlan.create_data_round(0, modulation, data_slots)
+            lwb_round.LWBRoundPlan.create_stream_request_round(0, modulation, BENCHMARK_ROUND_DATA_SLOTS)
+            lwb_round.LWBRoundPlan.create_notification_round(0, modulation, data_slots)
+            lwb_round.LWBRoundPlan.create_lp_notification_round(0, modulation, BENCHMARK_ROUND_DATA_SLOTS)
+
+    return run, 5 * len(modulations)
+
+
+def setup_message_channel(node_count=None, event_count=None, seed=0):
+    if node_count is None:
+        node_count = BENCHMARK_CHANNEL_NODE_COUNT
+
+    network = SimNetwork(None, node_count=node_count, event_count=0, path_loss=BENCHMARK_PATH_LOSS, seed=seed)
+    network.build_link_matrices()
+
+    # Back-to-back floods of random sources, as seen by the message manager during a long run
+    rng = np.random.RandomState(seed)
+    timestamp = 0.0
+    for _ in range(BENCHMARK_CHANNEL_TRANSMISSIONS):
+        modulation = lwb_slot.RADIO_MODULATIONS[rng.randint(len(lwb_slot.RADIO_MODULATIONS))]
+        duration = RadioMath(RadioConfiguration(modulation)).get_message_toa(payload_size=rng.randint(256))
+        network.mm.mq.append(network.nodes[rng.randint(node_count)], modulation, gloria.DEFAULT_BAND,
+                             lwb_slot.RADIO_POWERS[rng.randint(len(lwb_slot.RADIO_POWERS))], timestamp,
+                             timestamp + duration, None, 0)
+        timestamp += duration * rng.uniform(0.2, 1.2)
+
+    queries = [(timestamp * rng.uniform(), lwb_slot.RADIO_MODULATIONS[rng.randint(len(lwb_slot.RADIO_MODULATIONS))],
+                network.nodes[rng.randint(node_count)]) for _ in range(BENCHMARK_CHANNEL_QUERIES)]
+
+    def run():
+        # The lookups of a CAD or reception: overlapping transmissions, their reachability and received powers
+        for start, modulation, rx_node in queries:
+            subset = network.mm.mq.overlapping(start, start + 1E-3, modulation=modulation, band=gloria.DEFAULT_BAND)
+            subset = subset.select(network.mc.get_reachable(modulation, rx_node, subset))
+            network.mc.get_rx_powers(rx_node, subset)
+
+    return run, len(queries)
+
+
+def setup_event_loop(node_count=None, event_count=None, seed=0):
+    if node_count is None:
+        node_count = BENCHMARK_NODE_COUNTS[0]
+    if event_count is None:
+        event_count = BENCHMARK_EVENT_COUNT
+
+    network = SimNetwork(None, node_count=node_count, event_count=0, path_loss=BENCHMARK_PATH_LOSS, seed=seed)
+    network.run()  # Starts the nodes without processing any event
+
+    def run():
+        processed_count = network.em.processed_count
+        network.em.event_count = event_count
+        network.em.loop()
+        return network.em.processed_count - processed_count
+
+    return run, event_count
+
+
+def setup_sim_run(node_count=None, event_count=None, seed=0):
+    if node_count is None:
+        node_count = BENCHMARK_NODE_COUNTS[0]
+    if event_count is None:
+        event_count = BENCHMARK_EVENT_COUNT
+
+    output_directory = tempfile.TemporaryDirectory(prefix="flora_benchmark_")
+    sim = Sim(output_path=output_directory.name, event_count=event_count, seed=seed, node_count=node_count,
+              path_loss=BENCHMARK_PATH_LOSS)
+
+    # The trace directory is removed together with the operation, which holds the only reference to it
+    def run(output_directory=output_directory):
+        sim.run()
+        return sim.network.em.processed_count
+
+    return run, event_count
+
+
+def get_cli_env():
+    package_path = os.path.dirname(os.path.dirname(os.path.abspath(flora_tools.__file__)))
+    python_paths = [package_path] + ([os.environ['PYTHONPATH']] if os.environ.get('PYTHONPATH') else [])
+    return dict(os.environ, PYTHONPATH=os.pathsep.join(python_paths))
+
+
+def check_cli_imports(env=None):
+    # Fails if a fresh interpreter printing the CLI help imported any package of CLI_LAZY_MODULES
+    if env is None:
+        env = get_cli_env()
+
+    process = subprocess.run([sys.executable, '-c', CLI_STARTUP_SCRIPT], env=env, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    modules = process.stderr.splitlines()[-1].split()  # Printed last, after any warnings
+    imported = sorted({module.split('.')[0] for module in modules} & set(CLI_LAZY_MODULES))
+    if imported:
+        raise RuntimeError("The CLI imports {} at startup, subcommands have to import them lazily".format(imported))
+
+
+def setup_cli_startup(node_count=None, event_count=None, seed=0):
+    # A fresh interpreter printing the CLI help, i.e. the imports and argument parsing every subcommand pays for
+    env = get_cli_env()
+    check_cli_imports(env)
+
+    def run():
+        subprocess.run([sys.executable, '-m', 'flora_tools', '--help'], env=env, stdout=subprocess.DEVNULL,
+                       check=True)
+
+    return run, 1
+
+
+BENCHMARKS = {
+    'cli_startup': setup_cli_startup,
+    'message_toa': setup_message_toa,
+    'gloria_flood': setup_gloria_flood,
+    'lwb_round': setup_lwb_round,
+    'lwb_round_plan': setup_lwb_round_plan,
+    'message_channel': setup_message_channel,
+    'event_loop': setup_event_loop,
+    'sim_run': setup_sim_run,
+}
+SCALED_BENCHMARKS = ['sim_run']  # Run once per node count
+
+
+class SimBenchmark:
+    def __init__(self, output_path=None, benchmarks=None, node_counts=None, event_count: int = None,
+                 repeat: int = BENCHMARK_REPEAT, seed: int = 0):
+        if benchmarks is None:
+            benchmarks = list(BENCHMARKS)
+        unknown = [name for name in benchmarks if name not in BENCHMARKS]
+        if unknown:
+            raise ValueError("Unknown benchmarks {}, available are {}".format(unknown, list(BENCHMARKS)))
+        if node_counts is None:
+            node_counts = BENCHMARK_NODE_COUNTS
+        if event_count is None:
+            event_count = BENCHMARK_EVENT_COUNT
+
+        self.output_path = output_path
+
+        self.cases = []
+        for name in benchmarks:
+            for node_count in (node_counts if name in SCALED_BENCHMARKS else [None]):
+                self.cases.append({
+                    'name': name,
+                    'node_count': node_count,
+                    'event_count': event_count,
+                    'repeat': repeat,
+                    'seed': seed,
+                })
+
+    def run(self) -> pd.DataFrame:
+        # Each case runs in a freshly spawned process, so that the peak RSS is its own. A forked process would start
+        # with the peak RSS of this one.
+        results = []
+        for case in self.cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                results.append(executor.submit(SimBenchmark.run_case, case).result())
+
+        if self.output_path is not None:
+            with open(os.path.join(self.output_path, BENCHMARK_FILE), "w") as write_file:
+                json.dump({
+                    'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    'platform': platform.platform(),
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'results': results,
+                }, write_file, indent=4)
+
+        return SimBenchmark.to_frame(results)
+
+    @staticmethod
+    def run_case(case):
+        set_sim_log_level(BENCHMARK_LOG_LEVEL)
+
+        times = []
+        events = None
+        number = 1
+        for index in range(case['repeat']):
+            # Fresh setup per repetition, a finished simulation cannot run again
+            run, operation_count = BENCHMARKS[case['name']](node_count=case['node_count'],
+                                                            event_count=case['event_count'], seed=case['seed'])
+            while True:
+                start = time.perf_counter()
+                for _ in range(number):
+                    events = run()
+                elapsed = time.perf_counter() - start
+
+                # Operations without events are short and repeatable, they get repeated up to a measurable time
+                if index or events is not None or elapsed >= BENCHMARK_MIN_TIME:
+                    break
+                number *= 2
+
+            times.append(elapsed / number)
+
+        best_time = min(times)
+        return {
+            'name': case['name'],
+            'node_count': case['node_count'],
+            'repeat': case['repeat'],
+            'number': number,
+            'times': times,
+            'best_time': best_time,
+            'mean_time': float(np.mean(times)),
+            'operations': operation_count,
+            'operations_per_second': operation_count / best_time if best_time > 0 else None,
+            'events': events,
+            'events_per_second': events / best_time if events is not None and best_time > 0 else None,
+            'peak_rss': get_peak_rss(),
+        }
+
+    @staticmethod
+    def to_frame(results) -> pd.DataFrame:
+        return pd.DataFrame(results, columns=['name', 'node_count', 'best_time', 'operations_per_second', 'events',
+                                              'events_per_second', 'peak_rss'])
+
+    @staticmethod
+    def load(path) -> pd.DataFrame:
+        if os.path.isdir(path):
+            path = os.path.join(path, BENCHMARK_FILE)
+        with open(path) as read_file:
+            return SimBenchmark.to_frame(json.load(read_file)['results'])
+
+    @staticmethod
+    def compare(results: pd.DataFrame, baseline: pd.DataFrame,
+                threshold: float = BENCHMARK_REGRESSION_THRESHOLD) -> pd.DataFrame:
+        # Throughput relative to the baseline, matched by benchmark name and node count
+        keys = ['name', 'node_count']
+        comparison = results.fillna({'node_count': -1}).merge(baseline.fillna({'node_count': -1}), on=keys,
+                                                              suffixes=('', '_baseline'))
+        comparison['node_count'] = comparison['node_count'].replace(-1, np.nan)
+        comparison['throughput_ratio'] = (comparison['operations_per_second']
+                                          / comparison['operations_per_second_baseline'])
+        comparison['peak_rss_ratio'] = comparison['peak_rss'] / comparison['peak_rss_baseline']
+        comparison['regressed'] = comparison['throughput_ratio'] < threshold
+        return comparison[keys + ['operations_per_second', 'operations_per_second_baseline', 'throughput_ratio',
+                                  'peak_rss_ratio', 'regressed']]
@@ -1,10 +1,23 @@
+import csv
+import heapq
 import logging
+from collections import deque
 from enum import Enum
+from itertools import count
 
 import pandas as pd
 
 import flora_tools.sim.sim_network as sim_network
 import flora_tools.sim.sim_node as sim_node
+from flora_tools.sim.sim_logging import get_sim_logger
+from flora_tools.sim.sim_options import EventHistoryPolicy
+
+EVENT_COLUMNS = ['timestamp', 'local_timestamp', 'node', 'type', 'data', 'callback']
+EVENT_QUEUE_COMPACTION_RATIO = 0.5  # Rebuild the heap as soon as half of its entries are cancelled
+EVENT_HISTORY_SIZE = 1000  # Processed events kept by the RING history policy
+EVENT_HISTORY_SPILL_CHUNK = 1000  # Processed events buffered by the SPILL history policy before writing them
+EVENT_HISTORY_FILE = "event_history.csv"  # Spilled event history in the output directory
+SPILLED_EVENT_COLUMNS = ['timestamp', 'local_timestamp', 'node', 'type', 'callback']
 
 
 class SimEventType(Enum):
@@ -16,61 +29,191 @@ class SimEventType(Enum):
     TX_DONE_BEFORE_RX_TIMEOUT = 6
 
 
+class SimEvent:
+    __slots__ = ('timestamp', 'local_timestamp', 'node', 'type', 'data', 'callback', 'sequence', 'cancelled')
+
+    def __init__(self, timestamp: float, local_timestamp: float, node: 'sim_node.SimNode', type: SimEventType,
+                 data, callback, sequence: int):
+        self.timestamp = timestamp
+        self.local_timestamp = local_timestamp
+        self.node = node
+        self.type = type
+        self.data = data
+        self.callback = callback
+        self.sequence = sequence
+        self.cancelled = False
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __str__(self):
+        return "<SimEvent {:f},{},{},{}>".format(self.timestamp, self.node, self.type, self.callback.__qualname__)
+
+    @property
+    def row(self):
+        return [self.timestamp, self.local_timestamp, self.node, self.type, self.data, self.callback]
+
+    @property
+    def compact_row(self):
+        return [self.timestamp, self.local_timestamp, self.node.id, self.type.name, self.callback.__qualname__]
+
+
 class SimEventManager:
-    def __init__(self, network: 'sim_network.SimNetwork', event_count: int = None, time_limit: float = None):
-        self.logger = logging.getLogger(self.__class__.__qualname__)
+    def __init__(self, network: 'sim_network.SimNetwork', event_count: int = None, time_limit: float = None,
+                 history: EventHistoryPolicy = EventHistoryPolicy.RING, history_size: int = EVENT_HISTORY_SIZE,
+                 history_path=None):
+        self.logger = get_sim_logger(self.__class__.__qualname__)
 
         self.network = network
         self.event_count = event_count
         self.time_limit = time_limit
 
-        self.eq = pd.DataFrame(
-            columns=['timestamp', 'local_timestamp', 'node', 'type', 'data', 'callback'])
-        self.processed_eq = pd.DataFrame(
-            columns=['timestamp', 'local_timestamp', 'node', 'type', 'data', 'callback'])
+        self.heap = []  # Entries are (timestamp, sequence, event); the sequence keeps equal timestamps FIFO
+        self.sequence = count()
+        self.pending = {}  # (node, type) -> {event: None}, used for the bulk removal of events
+        self.cancelled_count = 0
+
+        self.history_policy = history
+        self.processed_count = 0
+        self.restart_history(history_path)
+
+        self.history = deque(maxlen=(history_size if self.history_policy is EventHistoryPolicy.RING else None))
+
+        self.profiler = None  # Optional SimProfiler, records the cost of every processed event
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled_count
+
+    def __getstate__(self):
+        # The processed events are not part of a snapshot
+        self.flush_history()
+        state = self.__dict__.copy()
+        state['sequence'] = next(self.sequence)
+        state['history'] = deque(maxlen=self.history.maxlen)
+        return state
+
+    def __setstate__(self, state):
+        state['sequence'] = count(state['sequence'])
+        self.__dict__.update(state)
+
+    @property
+    def processed_eq(self):
+        if self.history_policy is EventHistoryPolicy.SPILL:
+            self.flush_history()
+            return pd.read_csv(self.history_path)
+        else:
+            return pd.DataFrame([row for row in self.history], columns=EVENT_COLUMNS)
+
+    def restart_history(self, history_path):
+        # Spilled events go to a new file, e.g. the output directory of a network restored from a snapshot
+        self.history_path = history_path
+        if self.history_policy is EventHistoryPolicy.SPILL:
+            if self.history_path is None:
+                raise ValueError("The SPILL event history requires a history path")
+            with open(self.history_path, "w", newline='') as history_file:
+                csv.writer(history_file).writerow(SPILLED_EVENT_COLUMNS)
+
+    def flush_history(self):
+        if self.history_policy is EventHistoryPolicy.SPILL and self.history:
+            with open(self.history_path, "a", newline='') as history_file:
+                csv.writer(history_file).writerows(self.history)
+            self.history.clear()
+
+    @property
+    def eq(self):
+        entries = sorted(entry for entry in self.heap if not entry[2].cancelled)
+        return pd.DataFrame([entry[2].row for entry in entries], columns=EVENT_COLUMNS)
 
     def loop(self, iterations=1):
         while (self.event_count is not None and self.event_count > 0) or (
                 self.time_limit is not None) and self.network.global_timestamp <= self.time_limit:
+            if self.profiler is not None:
+                iteration_start = self.profiler.timer()
+
             self.log_event_queue()
 
-            self.eq = self.eq.sort_values(by=['timestamp'])
-            event = self.eq.iloc[0]
-            self.eq = self.eq.iloc[1:len(self.eq), :]
+            event = self.pop_event()
+            if event is None:
+                break
             self.process_event(event)
 
+            if self.profiler is not None:
+                self.profiler.record_iteration(self.profiler.timer() - iteration_start)
+
             if self.event_count is not None:
                 self.event_count -= 1
 
-    def process_event(self, event):
-        self.logger.info(
-            "{:12f}\t{:3d}\t{:24s}\t{:24s}".format(event['timestamp'], event['node'].id, event['type'],
-                                                       event['callback'].__qualname__))
-        self.network.global_timestamp = event['timestamp']
-
-        event['node'].local_timestamp = event['local_timestamp']
-        event['callback'](event)
-        self.processed_eq.loc[len(self.processed_eq)] = event
+        self.flush_history()
+
+    def pop_event(self):
+        while self.heap:
+            event = heapq.heappop(self.heap)[2]
+            if event.cancelled:
+                self.cancelled_count -= 1
+            else:
+                self.pending[(event.node, event.type)].pop(event)
+                return event
+        return None
+
+    def process_event(self, event: SimEvent):
+        if self.logger.is_enabled(logging.INFO):
+            self.logger.info("%(timestamp)12f\t%(node)3d\t%(type)-24s\t%(callback)-24s", timestamp=event.timestamp,
+                             node=event.node.id, type=event.type, callback=event.callback.__qualname__)
+        self.network.global_timestamp = event.timestamp
+
+        event.node.local_timestamp = event.local_timestamp
+        if self.profiler is None:
+            event.callback(event)
+        else:
+            start = self.profiler.timer()
+            event.callback(event)
+            self.profiler.record(event, self.profiler.timer() - start)
+        self.processed_count += 1
+
+        if self.history_policy is EventHistoryPolicy.RING or self.history_policy is EventHistoryPolicy.ALL:
+            self.history.append(event.row)
+        elif self.history_policy is EventHistoryPolicy.SPILL:
+            self.history.append(event.compact_row)
+            if len(self.history) >= EVENT_HISTORY_SPILL_CHUNK:
+                self.flush_history()
 
     def register_event(self, timestamp: float, node: 'sim_node.SimNode', event_type: SimEventType,
-                       callback, data=None, local=True):
+                       callback, data=None, local=True) -> SimEvent:
         if local:
             local_timestamp = timestamp
             timestamp = node.transform_local_to_global_timestamp(timestamp)
         else:
             local_timestamp = node.transform_global_to_local_timestamp(timestamp)
 
-        tmp_df = pd.DataFrame([[timestamp,
-                                local_timestamp, node, event_type, data, callback]],
-                              columns=['timestamp', 'local_timestamp', 'node', 'type', 'data', 'callback'])
+        event = SimEvent(timestamp, local_timestamp, node, event_type, data, callback, next(self.sequence))
+
+        heapq.heappush(self.heap, (timestamp, event.sequence, event))
+        self.pending.setdefault((node, event_type), {})[event] = None
 
-        self.eq = self.eq.append(tmp_df)
+        return event
 
-    def unregister_event(self, index):
-        self.eq = self.eq.drop(index, inplace=True)
+    def unregister_event(self, event: SimEvent):
+        bucket = self.pending.get((event.node, event.type))
+        if bucket is not None and event in bucket:
+            del bucket[event]
+            self.cancel(event)
 
     def remove_all_events(self, node, event_type):
-        self.eq = self.eq.loc[(self.eq.node != node) | (self.eq.type != event_type)]
+        bucket = self.pending.get((node, event_type))
+        if bucket:
+            for event in bucket:
+                self.cancel(event)
+            bucket.clear()
+
+    def cancel(self, event: SimEvent):
+        event.cancelled = True
+        self.cancelled_count += 1
+
+        if self.cancelled_count > len(self.heap) * EVENT_QUEUE_COMPACTION_RATIO:
+            self.heap = [entry for entry in self.heap if not entry[2].cancelled]
+            heapq.heapify(self.heap)
+            self.cancelled_count = 0
 
     def log_event_queue(self):
-        self.logger.debug("{}\n{}\n".format("Event Queue:", self.eq.to_string()))
+        if self.logger.is_enabled(logging.DEBUG):
+            self.logger.debug("Event Queue:\n%(queue)s\n", queue=self.eq.to_string())
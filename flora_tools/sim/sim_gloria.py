@@ -4,7 +4,6 @@ import flora_tools.gloria as gloria_flood
 import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_event_manager as sim_event_manager
 import flora_tools.sim.sim_node as sim_node
-import gloria
 from flora_tools.sim.sim_message import SimMessage, SimMessageType
 
 MAX_ACKS = 1
@@ -185,7 +184,7 @@ class SimGloriaFlood:
 
                     self.ack_message = SimMessage(slot.tx_marker,
                                                   source=self.tx_message.source,
-                                                  payload=gloria.GLORIA_ACK_LENGTH,
+                                                  payload=gloria_flood.GLORIA_ACK_LENGTH,
                                                   destination=self.tx_message.source,
                                                   type=SimMessageType.GLORIA_ACK,
                                                   power_level=self.tx_message.power_level,
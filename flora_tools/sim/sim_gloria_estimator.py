@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+
+import flora_tools.gloria as gloria
+import flora_tools.lwb_slot as lwb_slot
+import flora_tools.sim.sim_network as sim_network
+from flora_tools.sim.sim_topology import SparsePathLossMatrix
+
+ESTIMATOR_TRIAL_COUNT = 1000
+ESTIMATOR_BATCH_ELEMENTS = 2 ** 22  # Upper bound of the trials x transmitters x receivers arrays per batch
+ESTIMATOR_LINK_FADING = 2.0  # Scale of the logistic reception probability around the link budget [dB]
+NO_SLOT = -1
+
+
+def get_reception_probabilities(network: 'sim_network.SimNetwork', modulation: int,
+                                fading: float = ESTIMATOR_LINK_FADING) -> np.ndarray:
+    # Reception probabilities indexed by [power level, rx node id, tx node id]. Links at the link budget succeed with
+    # a probability of 0.5, a fading of zero yields the reachability of the event-driven simulation.
+    path_loss_matrix = network.path_loss_matrix
+    if isinstance(path_loss_matrix, SparsePathLossMatrix):
+        path_losses = path_loss_matrix.get_row_set(range(len(path_loss_matrix)))
+    else:
+        path_losses = np.asarray(path_loss_matrix)
+
+    margins = network.link_budgets[modulation][:, np.newaxis, np.newaxis] - path_losses[np.newaxis, :, :]
+    if fading > 0:
+        with np.errstate(over='ignore'):
+            probabilities = 1 / (1 + np.exp(-margins / fading))
+    else:
+        probabilities = (margins >= 0).astype(float)
+
+    nodes = np.arange(len(path_losses))
+    probabilities[:, nodes, nodes] = 0
+    return probabilities
+
+
+class GloriaFloodEstimate:
+    # Outcome of independent trials of a flood, the arrays are indexed by [trial, node id]. Nodes that never received
+    # the flood have a NaN latency and a hop count of -1.
+    def __init__(self, source: int, received: np.ndarray, latency: np.ndarray, hop_count: np.ndarray,
+                 tx_count: np.ndarray, acknowledged: np.ndarray = None):
+        self.source = source
+        self.received = received
+        self.latency = latency
+        self.hop_count = hop_count
+        self.tx_count = tx_count
+        self.acknowledged = acknowledged
+
+    @property
+    def trial_count(self):
+        return self.received.shape[0]
+
+    @property
+    def coverage(self) -> np.ndarray:
+        # Share of the other nodes reached per trial
+        others = np.arange(self.received.shape[1]) != self.source
+        return self.received[:, others].mean(axis=1) if np.any(others) else np.ones(self.trial_count)
+
+    @property
+    def reliability(self) -> np.ndarray:
+        # Reception probability per node
+        return self.received.mean(axis=0)
+
+    @property
+    def total_tx_count(self) -> np.ndarray:
+        return self.tx_count.sum(axis=1)
+
+    def summary(self) -> dict:
+        latencies = self.latency[self.received & (np.arange(self.received.shape[1]) != self.source)]
+        summary = {
+            'source': self.source,
+            'trial_count': self.trial_count,
+            'coverage_mean': self.coverage.mean(),
+            'coverage_min': self.coverage.min(),
+            'full_coverage': np.mean(self.coverage == 1),
+            'latency_mean': latencies.mean() if len(latencies) else np.nan,
+            'latency_95': np.percentile(latencies, 95) if len(latencies) else np.nan,
+            'latency_max': latencies.max() if len(latencies) else np.nan,
+            'tx_count_mean': self.total_tx_count.mean(),
+            'tx_count_max': self.total_tx_count.max(),
+        }
+        if self.acknowledged is not None:
+            summary['acknowledged'] = self.acknowledged.mean()
+        return summary
+
+
+class SimGloriaEstimator:
+    # Monte Carlo counterpart of SimGloriaFlood. Instead of events, all nodes of many independent trials advance slot
+    # by slot as NumPy arrays. It follows the slots of GloriaFlood.generate() and the retransmission, power increase
+    # and ACK rules of SimGloriaFlood. Receptions are independent per link, concurrent transmissions of the flood do
+    # not interfere and a receiver takes over the hop count and power level of its strongest transmitter.
+    def __init__(self, reception_probabilities: np.ndarray, modulation: int,
+                 payload: int = lwb_slot.LWB_MAX_DATA_PAYLOAD, retransmission_count: int = None,
+                 hop_count: int = None, power_level: int = None, acked=False, power_increase=True, seed: int = None):
+        reception_probabilities = np.asarray(reception_probabilities, dtype=float)
+        if reception_probabilities.ndim == 2:
+            reception_probabilities = reception_probabilities[np.newaxis, :, :]
+        self.reception_probabilities = reception_probabilities
+
+        if retransmission_count is None:
+            retransmission_count = lwb_slot.GLORIA_RETRANSMISSIONS_COUNTS[modulation]
+        if hop_count is None:
+            hop_count = lwb_slot.GLORIA_HOP_COUNTS[modulation]
+        if power_level is None:
+            power_level = lwb_slot.GLORIA_DEFAULT_POWER_LEVELS[modulation]
+
+        self.modulation = modulation
+        self.power_level = power_level
+        self.power_increase = power_increase
+        self.rng = np.random.RandomState(seed)
+
+        self.flood = gloria.GloriaFlood(None, modulation, payload, retransmission_count, hop_count, is_ack=acked,
+                                        power=lwb_slot.RADIO_POWERS[power_level])
+        self.flood.generate()
+
+        offsets = np.array([offset for offset, _, _, _ in self.flood.template.slots])
+        self.slot_types = [type for _, type, _, _ in self.flood.template.slots]
+        # Latency of a reception in each slot, relative to the initial transmission
+        self.latencies = offsets - offsets[0] + self.flood.gloria_timings.radio_math.get_message_toa(
+            payload_size=payload)
+
+    @staticmethod
+    def from_network(network: 'sim_network.SimNetwork', modulation: int, fading: float = ESTIMATOR_LINK_FADING,
+                     **kwargs) -> 'SimGloriaEstimator':
+        return SimGloriaEstimator(get_reception_probabilities(network, modulation, fading=fading), modulation,
+                                  **kwargs)
+
+    @property
+    def node_count(self):
+        return self.reception_probabilities.shape[1]
+
+    @property
+    def max_power_level(self):
+        return min(len(lwb_slot.RADIO_POWERS), len(self.reception_probabilities)) - 1
+
+    def estimate(self, source: int, destination: int = None,
+                 trial_count: int = ESTIMATOR_TRIAL_COUNT) -> GloriaFloodEstimate:
+        batch_size = max(1, ESTIMATOR_BATCH_ELEMENTS // self.node_count ** 2)
+        batches = [self.run_trials(source, destination, min(batch_size, trial_count - start))
+                   for start in range(0, trial_count, batch_size)]
+
+        return GloriaFloodEstimate(
+            source,
+            *[np.concatenate([batch[i] for batch in batches]) for i in range(4)],
+            acknowledged=(np.concatenate([batch[4] for batch in batches])
+                          if self.flood.acked and destination is not None else None))
+
+    def estimate_all(self, sources=None, destination: int = None,
+                     trial_count: int = ESTIMATOR_TRIAL_COUNT) -> pd.DataFrame:
+        if sources is None:
+            sources = range(self.node_count)
+
+        return pd.DataFrame([self.estimate(source, destination=destination, trial_count=trial_count).summary()
+                             for source in sources]).set_index('source')
+
+    def run_trials(self, source: int, destination: int, trial_count: int):
+        shape = (trial_count, self.node_count)
+        trials = np.arange(trial_count)[:, np.newaxis]
+        acked = self.flood.acked
+
+        has_message = np.zeros(shape, dtype=bool)
+        has_message[:, source] = True
+        first_rx_slot_index = np.full(shape, (-2 if acked else -1), dtype=np.int64)
+        power_level = np.full(shape, min(self.power_level, self.max_power_level), dtype=np.int64)
+        retransmission_count = np.full(shape, self.flood.retransmission_count, dtype=np.int64)
+        hop_count = np.full(shape, -1, dtype=np.int64)
+        hop_count[:, source] = 0
+        latency = np.full(shape, np.nan)
+        latency[:, source] = 0
+        tx_count = np.zeros(shape, dtype=np.int64)
+
+        # Nodes stop taking part in the flood once they relayed an ACK (or are waiting to relay one)
+        finished = np.zeros(shape, dtype=bool)
+        ack_slot_index = np.full(shape, NO_SLOT, dtype=np.int64)
+        ack_power_level = np.zeros(shape, dtype=np.int64)
+        acknowledged = np.zeros(trial_count, dtype=bool)
+
+        is_initial_node = np.zeros(self.node_count, dtype=bool)
+        is_initial_node[source] = True
+        is_destination = np.zeros(self.node_count, dtype=bool)
+        if acked and destination is not None:
+            is_destination[destination] = True
+
+        if self.flood.hop_count <= 0 or self.flood.retransmission_count <= 0:
+            return has_message, latency, hop_count, tx_count, acknowledged
+
+        for slot_index, slot_type in enumerate(self.slot_types):
+            active = ~finished & (ack_slot_index == NO_SLOT)
+
+            if slot_type in [gloria.GloriaSlotType.RX_ACK, gloria.GloriaSlotType.TX_ACK]:
+                relays = ack_slot_index == slot_index
+                initial_acks = active & has_message & is_destination
+                transmitters = relays | initial_acks
+                ack_power_level[initial_acks] = power_level[initial_acks]
+                finished |= transmitters
+
+                received, detected, strongest = self.receive(transmitters, ack_power_level, active & ~transmitters)
+
+                acknowledged |= received[:, source]
+                ack_power_level[received] = ack_power_level[trials, strongest][received]
+                ack_slot_index[received] = slot_index + 2
+                increased = detected & ~received & has_message
+            else:
+                distance = slot_index - first_rx_slot_index
+                transmitters = active & has_message & (retransmission_count > 0) & (
+                    (distance // 2) % 2 == 1 if acked else distance % 2 == 1)
+
+                received, detected, strongest = self.receive(transmitters, power_level, active & ~transmitters)
+
+                first_rx = received & ~has_message
+                has_message |= first_rx
+                first_rx_slot_index[first_rx] = slot_index
+                hop_count[first_rx] = (hop_count[trials, strongest] + 1)[first_rx]
+                latency[first_rx] = self.latencies[slot_index]
+                tx_count += transmitters
+                retransmission_count -= transmitters
+
+                # Taken over at the power level the strongest transmitter used, before its own increase
+                new_power_level = power_level[trials, strongest]
+                power_level[first_rx] = new_power_level[first_rx]
+
+                # After each transmission, each redundant reception and each failed reception
+                increased = transmitters | (received & ~first_rx & ~is_initial_node) | (
+                        detected & ~received & has_message)
+
+            if self.power_increase:
+                power_level[increased] = np.minimum(power_level[increased] + 1, self.max_power_level)
+
+        return has_message, latency, hop_count, tx_count, acknowledged
+
+    def receive(self, transmitters: np.ndarray, power_level: np.ndarray, receivers: np.ndarray):
+        # Probabilities indexed by [trial, tx node, rx node], only the active transmitters contribute
+        probabilities = self.reception_probabilities[
+            np.minimum(power_level, len(self.reception_probabilities) - 1), :, np.arange(self.node_count)]
+        probabilities = np.where(transmitters[:, :, np.newaxis], probabilities, 0)
+
+        missed = np.prod(1 - probabilities, axis=1)
+        detected = receivers & np.any(probabilities > 0, axis=1)
+        received = detected & (self.rng.random_sample(receivers.shape) >= missed)
+
+        return received, detected, np.argmax(probabilities, axis=1)
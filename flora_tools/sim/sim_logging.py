@@ -0,0 +1,46 @@
+import logging
+
+import coloredlogs
+
+from flora_tools.sim.sim_options import SIM_LOG_LEVELS
+
+SIM_LOGGER_NAME = 'flora_tools.sim'
+
+sim_loggers = {}
+
+
+class SimLogger:
+    # Checks the level before anything gets formatted. Records carry their fields as the 'sim' attribute, the
+    # message itself is only interpolated with these fields by the handlers that actually emit the record.
+    def __init__(self, name: str):
+        self.logger = logging.getLogger("{}.{}".format(SIM_LOGGER_NAME, name))
+
+    def is_enabled(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level: int, message: str, **fields):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, message, fields, extra={'sim': fields})
+
+    def debug(self, message: str, **fields):
+        self.log(logging.DEBUG, message, **fields)
+
+    def info(self, message: str, **fields):
+        self.log(logging.INFO, message, **fields)
+
+
+def get_sim_logger(name: str) -> SimLogger:
+    logger = sim_loggers.get(name)
+    if logger is None:
+        logger = SimLogger(name)
+        sim_loggers[name] = logger
+    return logger
+
+
+def set_sim_log_level(level):
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+
+    logging.getLogger(SIM_LOGGER_NAME).setLevel(level)
+    if level < coloredlogs.get_level():
+        coloredlogs.set_level(level)
@@ -6,16 +6,17 @@ import flora_tools.lwb_round as lwb_round
 import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_lwb as sim_lwb_manager
 import flora_tools.sim.sim_node as sim_node
+from flora_tools.sim.sim_logging import get_sim_logger
 from flora_tools.sim.sim_lwb_slot import SimLWBSlot
 from flora_tools.sim.sim_message import SimMessage, SimMessageType
-from flora_tools.sim.sim_tracer import LWBRoundActivity
+from flora_tools.sim.sim_tracer import LWBRoundActivity, Event, TraceEventType
 
 
 class SimLWBRound:
     def __init__(self, node: 'sim_node.SimNode', lwb: 'sim_lwb_manager.SimLWB',
                  round: 'lwb_round.LWBRound', callback):
 
-        self.logger = logging.getLogger(self.__class__.__qualname__)
+        self.logger = get_sim_logger(self.__class__.__qualname__)
 
         self.node = node
         self.lwb = lwb
@@ -35,12 +36,11 @@ class SimLWBRound:
         self.process_slot()
 
     def log_round(self):
-        self.logger.info(
-            "Marker:{:10f}\tNode:{:3d}\tMod:{:2d}\tType:{:16s}\tTime:{:10f}".format(self.round.round_marker,
-                                                                                    self.node.id,
-                                                                                    self.round.modulation,
-                                                                                    self.round.type,
-                                                                                    self.round.total_time))
+        if self.logger.is_enabled(logging.INFO):
+            self.logger.info(
+                "Marker:%(marker)10f\tNode:%(node)3d\tMod:%(modulation)2d\tType:%(type)-16s\tTime:%(time)10f",
+                marker=self.round.round_marker, node=self.node.id, modulation=self.round.modulation,
+                type=self.round.type, time=self.round.total_time)
 
     def process_next_slot(self):
         self.current_slot_index += 1
@@ -138,6 +138,11 @@ class SimLWBRound:
                 and self.ack_stream.master is not self.node):
             if message is None and self.ack_stream is not None:
                 self.ack_stream.fail()
+                self.node.network.tracer.log_event(
+                    Event(TraceEventType.DATA_LOST, self.node.network.global_timestamp, self.ack_stream.node))
+            elif message is not None and message.type is SimMessageType.DATA:
+                self.node.network.tracer.log_event(
+                    Event(TraceEventType.DATA_DELIVERED, self.node.network.global_timestamp, message.source))
 
         if message is not None and message.type is SimMessageType.DATA:
             self.ack_stream = message.content['stream']
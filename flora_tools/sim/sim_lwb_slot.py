@@ -3,6 +3,7 @@ import logging
 import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_node as sim_node
 from flora_tools.sim.sim_gloria import SimGloriaFlood
+from flora_tools.sim.sim_logging import get_sim_logger
 from flora_tools.sim.sim_message import SimMessage, SimMessageType
 from flora_tools.sim.sim_tracer import LWBSlotActivity
 
@@ -10,7 +11,7 @@ from flora_tools.sim.sim_tracer import LWBSlotActivity
 class SimLWBSlot:
     def __init__(self, node: 'sim_node.SimNode', slot: 'lwb_slot.LWBSlot', callback, master: 'sim_node.SimNode' = None,
                  message: 'SimMessage' = None):
-        self.logger = logging.getLogger(self.__class__.__qualname__)
+        self.logger = get_sim_logger(self.__class__.__qualname__)
 
         self.node = node
         self.slot = slot
@@ -38,11 +39,10 @@ class SimLWBSlot:
                        power_increase=self.power_increase, update_timestamp=self.update_timestamp)
 
     def log_slot(self):
-        self.logger.info(
-            "Marker:{:10f}\tNode:{:3d}\tMod:{:2d}\tType:{:16s}".format(self.slot.slot_marker,
-                                                                       self.node.id,
-                                                                       self.slot.modulation,
-                                                                       self.slot.type))
+        if self.logger.is_enabled(logging.INFO):
+            self.logger.info("Marker:%(marker)10f\tNode:%(node)3d\tMod:%(modulation)2d\tType:%(type)-16s",
+                             marker=self.slot.slot_marker, node=self.node.id, modulation=self.slot.modulation,
+                             type=self.slot.type)
 
     def finished_flood(self, message: 'SimMessage'):
         if self.node.role is sim_node.SimNodeRole.BASE:
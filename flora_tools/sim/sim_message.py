@@ -4,7 +4,7 @@ import numpy as np
 
 import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_node as sim_node
-from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.radio_configuration import get_radio_configuration
 from flora_tools.radio_math import RadioMath
 
 
@@ -20,7 +20,24 @@ class SimMessageType(Enum):
     ACK = 8
 
 
+MESSAGE_RADIOS = {}  # Radio objects shared by all messages of the same (modulation, power, preamble)
+
+
+def get_message_radio(modulation: int, power_level: int):
+    key = (lwb_slot.RADIO_MODULATIONS[modulation], lwb_slot.RADIO_POWERS[power_level], (2 if modulation > 7 else 3))
+    radio = MESSAGE_RADIOS.get(key)
+    if radio is None:
+        radio_configuration = get_radio_configuration(key[0], key[1], tx=True, preamble=key[2])
+        radio = (radio_configuration, RadioMath(radio_configuration))
+        MESSAGE_RADIOS[key] = radio
+    return radio
+
+
 class SimMessage:
+    __slots__ = ('timestamp', 'id', 'source', 'destination', 'type', '_payload', 'content', 'modulation', 'band',
+                 '_tx_start', '_tx_end', 'power_level', 'hop_count', 'radio_configuration', 'radio_math',
+                 'freeze_hop_count', 'freeze_power_level', 'freeze_timestamp')
+
     def __init__(self, timestamp, source: 'sim_node.SimNode', payload, modulation, destination=None,
                  type=SimMessageType.DATA,
                  content=None, power_level=0, id=None, band=None, tx_start=None):
@@ -32,11 +49,12 @@ class SimMessage:
         self.source = source
         self.destination = destination
         self.type = type
-        self.payload = payload
+        self._payload = payload
         self.content = content
         self.modulation = modulation
         self.band = band
-        self.tx_start = tx_start
+        self._tx_start = tx_start
+        self._tx_end = None
 
         if id is not None:
             self.id = id
@@ -46,9 +64,8 @@ class SimMessage:
         self.power_level = power_level
 
         self.hop_count = 0
-        self.radio_configuration = RadioConfiguration(lwb_slot.RADIO_MODULATIONS[modulation], lwb_slot.RADIO_POWERS[self.power_level], tx=True,
-                                                      preamble=(2 if self.modulation > 7 else 3))
-        self.radio_math = RadioMath(self.radio_configuration)
+        # The radio is fixed at construction, later changes of the modulation or power level only apply to copies
+        self.radio_configuration, self.radio_math = get_message_radio(modulation, self.power_level)
 
         self.freeze_hop_count = self.hop_count
         self.freeze_power_level = self.power_level
@@ -94,18 +111,33 @@ class SimMessage:
         self.freeze_power_level = self.power_level
         self.freeze_timestamp = self.timestamp
 
+    @property
+    def payload(self):
+        return self._payload
+
+    @payload.setter
+    def payload(self, payload):
+        self._payload = payload
+        self._tx_end = None
+
+    @property
+    def tx_start(self):
+        return self._tx_start
+
+    @tx_start.setter
+    def tx_start(self, tx_start):
+        self._tx_start = tx_start
+        self._tx_end = None
+
     @property
     def tx_end(self):
-        return self.tx_start + self.radio_math.get_message_toa(payload_size=self.payload)
+        if self._tx_end is None:
+            self._tx_end = self._tx_start + self.radio_math.get_message_toa(payload_size=self._payload)
+        return self._tx_end
 
     @property
-    def hash(self):
-        return "{timestamp},{source},{destination},{type},{power_level},{hop_count},{id}".format(
-            timestamp=self.timestamp,
-            source=self.source,
-            destination=self.destination,
-            type=self.type,
-            content=self.content,
-            power_level=self.power_level,
-            hop_count=self.hop_count,
-            id=self.id)
+    def key(self) -> int:
+        # Integer identity of a transmitted message, transmissions with equal keys are the same hop of the same flood.
+        # Only built from ids and numbers, so it is stable across processes and snapshots.
+        return hash((self.timestamp, self.source.id, (self.destination.id if self.destination is not None else -1),
+                     self.type.value, self.power_level, self.hop_count, self.id))
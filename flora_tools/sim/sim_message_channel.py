@@ -6,10 +6,17 @@ import flora_tools.gloria as gloria
 import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_network as sim_network
 import flora_tools.sim.sim_node as sim_node
-from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.radio_configuration import RadioConfiguration, get_radio_configuration
 from flora_tools.radio_math import RadioMath, RADIO_SNR
 from flora_tools.sim.sim_message import SimMessage
 from flora_tools.sim.sim_tracer import CADActivity, RxActivity
+from flora_tools.sim.sim_transmission_store import SimTransmissionSet
+
+SAME_FLOOD_WINDOW = 100E6
+
+
+def linear_power(power):
+    return np.power(10, np.asarray(power) / 10)
 
 
 class SimMessageChannel:
@@ -26,7 +33,7 @@ class SimMessageChannel:
                                  lwb_slot.RADIO_POWERS[message.power_level]):
             return None, None
 
-        config = RadioConfiguration(modulation, preamble=gloria.GloriaTimings(modulation).preamble_len)
+        config = get_radio_configuration(modulation, preamble=gloria.get_gloria_timings(modulation).preamble_len)
         math = RadioMath(config)
 
         valid_rx_start = rx_start + math.get_symbol_time() * 0.1
@@ -34,26 +41,14 @@ class SimMessageChannel:
         if valid_rx_start > message.tx_start:
             return None, None
 
-        interfering_set = (self.mm.mq.loc[
-            (self.mm.mq.modulation == modulation) &
-            (self.mm.mq.band == band) &
-            (self.mm.mq.tx_end >= message.tx_start) &
-            (self.mm.mq.tx_start <= message.tx_end)
-            ]).copy()
+        interfering_set = self.mm.mq.overlapping(message.tx_start, message.tx_end, modulation=modulation, band=band)
+        interfering_set = interfering_set.select(
+            (interfering_set['message_key'] != message.key) | self.outside_same_flood_window(interfering_set, tx_start))
 
-        def calc_power_message(item):
-            return -self.calculate_path_loss(rx_node, item.source) + item.power
-
-        interfering_set['rx_power'] = interfering_set.apply(calc_power_message, axis=1)
         rx_power = -self.calculate_path_loss(rx_node, message.source) + lwb_slot.RADIO_POWERS[message.power_level]
+        interfering_power = np.sum(linear_power(self.get_rx_powers(rx_node, interfering_set)))
 
-        interfering_power = 0
-        for interferer_index, interferer in interfering_set.iterrows():
-            if interferer['message_hash'] != message.hash or not (
-                    (tx_start - 100E6) < interferer['tx_start'] < (tx_start + 100E6)):
-                interfering_power += np.power(10, interferer['rx_power'] / 10)
-
-        if np.power(10, rx_power / 10) > (interfering_power * np.power(10, RADIO_SNR[modulation])):
+        if linear_power(rx_power) > (interfering_power * np.power(10, RADIO_SNR[modulation])):
             rx_node.mm.unregister_rx(rx_node)
 
             self.network.tracer.log_activity(
@@ -71,116 +66,56 @@ class SimMessageChannel:
         self.mm.unregister_rx(rx_node)
         rx_start = rx_node.transform_local_to_global_timestamp(rx_start)
 
-        def mark_reachable_message(item):
-            return self.is_reachable(modulation, rx_node, item['source'], power=item['power'])
-
-        def calc_power_message(item):
-            return -self.calculate_path_loss(rx_node, self.network.nodes[item.source.id]) + item['power']
-
-        config = RadioConfiguration(modulation)
+        config = get_radio_configuration(modulation)
         math = RadioMath(config)
 
         valid_rx_start = rx_start + math.get_symbol_time() * 0.1
         keep_quiet_start = rx_start - 100E-6
 
-        interfering_set = (self.mm.mq.loc[
-            (self.mm.mq.band == band) &
-            (self.mm.mq.tx_end >= keep_quiet_start) &
-            (self.mm.mq.tx_start <= valid_rx_start)
-            ]).copy()
-
-        subset = (self.mm.mq.loc[
-            (self.mm.mq.modulation == modulation) &
-            (self.mm.mq.band == band) &
-            (self.mm.mq.tx_start >= valid_rx_start) &
-            (self.mm.mq.tx_start <= rx_timeout) &
-            (self.mm.mq.tx_end > rx_timeout)
-            ]).copy()
+        subset = self.mm.mq.starting_between(valid_rx_start, rx_timeout, modulation=modulation, band=band,
+                                             ending_after=rx_timeout)
+        subset = subset.select(self.get_reachable(modulation, rx_node, subset))
 
         if len(subset):
-            subset['reachable'] = subset.apply(mark_reachable_message, axis=1)
-            subset = subset.loc[subset.reachable == True]
-
-            if len(subset) > 0:
-                if len(interfering_set):
-                    interfering_set['rx_power'] = interfering_set.apply(calc_power_message, axis=1)
-
-                subset['rx_power'] = subset.apply(calc_power_message, axis=1)
-
-                candidates = []
-                for index_candidate, candidate in subset.sort_values(by=['tx_start'], ascending=False).iterrows():
-                    interfering_power = 0
-                    for index_interferer, interferer in interfering_set.iterrows():
-                        if interferer['message_hash'] is not candidate['message_hash'] or not (
-                                (candidate['tx_start'] - 100E6) < interferer['tx_start'] < (
-                                candidate['tx_start'] + 100E6)):
-                            interfering_power += np.power(10, interferer['rx_power'] / 10)
-
-                    if np.power(10, candidate['rx_power'] / 10) > (
-                            interfering_power * np.power(10, RADIO_SNR[modulation] / 10)):
-                        candidates.append(candidate)
-
-                if len(candidates) > 0:
-                    best_candidate = max(candidates, key=lambda candidate: candidate['rx_power'])
-                    return best_candidate['message'].copy(), best_candidate['source']
-                else:
-
-                    self.network.tracer.log_activity(
-                        RxActivity(rx_start, self.network.global_timestamp, rx_node,
-                                   RadioConfiguration.rx_energy(self.network.global_timestamp - rx_start),
-                                   modulation, False)
-                    )
-
-                    return None, None
-            else:
-
-                self.network.tracer.log_activity(
-                    RxActivity(rx_start, self.network.global_timestamp, rx_node,
-                               RadioConfiguration.rx_energy(self.network.global_timestamp - rx_start),
-                               modulation, False)
-                )
-
-                return None, None
-        else:
+            interfering_set = self.mm.mq.overlapping(keep_quiet_start, valid_rx_start, band=band)
 
-            self.network.tracer.log_activity(
-                RxActivity(rx_start, self.network.global_timestamp, rx_node,
-                           RadioConfiguration.rx_energy(self.network.global_timestamp - rx_start),
-                           modulation, False)
-            )
+            subset = subset.select(np.argsort(-subset['tx_start'], kind='stable'))
+            candidate_powers = self.get_rx_powers(rx_node, subset)
+            interferer_powers = linear_power(self.get_rx_powers(rx_node, interfering_set))
 
-            return None, None
+            # Candidates x interferers: a transmission never interferes with itself
+            interferes = ((subset['transmission_id'][:, np.newaxis] != interfering_set['transmission_id'])
+                          | self.outside_same_flood_window(interfering_set, subset['tx_start'][:, np.newaxis]))
+            interfering_powers = np.sum(np.where(interferes, interferer_powers, 0), axis=1)
+
+            captured = linear_power(candidate_powers) > (interfering_powers * np.power(10, RADIO_SNR[modulation] / 10))
+
+            if np.any(captured):
+                best_candidate = int(np.argmax(np.where(captured, candidate_powers, -np.inf)))
+                return subset['message'][best_candidate].copy(), subset['source'][best_candidate]
+
+        self.network.tracer.log_activity(
+            RxActivity(rx_start, self.network.global_timestamp, rx_node,
+                       RadioConfiguration.rx_energy(self.network.global_timestamp - rx_start),
+                       modulation, False)
+        )
+
+        return None, None
 
     def check_if_successfully_received(self, modulation, band, potential_message: 'SimMessage', rx_start: float,
                                        rx_node: 'sim_node.SimNode', tx_node: 'sim_node.SimNode'):
         rx_start = rx_node.transform_local_to_global_timestamp(rx_start)
 
-        def calc_power_message(item):
-            return -self.calculate_path_loss(rx_node, item['source']) + lwb_slot.RADIO_POWERS[item['message'].power_level]
-
-        interfering_set = (self.mm.mq.loc[
-            (self.mm.mq.modulation == modulation) &
-            (self.mm.mq.band == band) &
-            (self.mm.mq.tx_end > rx_start) &
-            (self.mm.mq.tx_start < potential_message.tx_end) &
-            (
-                    (self.mm.mq.message_hash != potential_message.hash) |
-                    ((self.mm.mq.tx_start < (potential_message.tx_start - 100E6)) |
-                     (self.mm.mq.tx_start > (potential_message.tx_start + 100E6)))
-            )
-            ]).copy()
-
-        if len(interfering_set):
-            interfering_set['rx_power'] = interfering_set.apply(calc_power_message, axis=1)
+        interfering_set = self.mm.mq.overlapping(rx_start, potential_message.tx_end, modulation=modulation,
+                                                 band=band, closed=False)
+        interfering_set = interfering_set.select(
+            (interfering_set['message_key'] != potential_message.key) | self.outside_same_flood_window(
+                interfering_set, potential_message.tx_start))
 
-        rx_power = calc_power_message({'message': potential_message, 'source': tx_node})
+        rx_power = -self.calculate_path_loss(rx_node, tx_node) + lwb_slot.RADIO_POWERS[potential_message.power_level]
+        interfering_power = np.sum(linear_power(self.get_rx_powers(rx_node, interfering_set)))
 
-        interfering_power = 0
-        if len(interfering_set):
-            for i in interfering_set.rx_power:
-                interfering_power += np.power(10, i / 10)
-
-        if np.power(10, rx_power / 10) > (interfering_power * np.power(10, RADIO_SNR[modulation] / 10)):
+        if linear_power(rx_power) > (interfering_power * np.power(10, RADIO_SNR[modulation] / 10)):
 
             self.network.tracer.log_activity(
                 RxActivity(rx_start, potential_message.tx_end, rx_node,
@@ -202,68 +137,43 @@ class SimMessageChannel:
     def cad_process(self, timestamp, rx_node: 'sim_node.SimNode', modulation, band):
         timestamp = rx_node.transform_local_to_global_timestamp(timestamp)
 
-        def mark_reachable_message(item):
-            return self.is_reachable(modulation, rx_node, item.source, power=item.power)
-
-        def calc_power_message(item):
-            return -self.calculate_path_loss(rx_node, item.source) + item.power
-
-        config = RadioConfiguration(modulation)
+        config = get_radio_configuration(modulation)
         math = RadioMath(config)
 
         cad_start = timestamp - math.get_symbol_time() * (1.5 - 0.5)  # -0.5 as signal had to present for longer time
         cad_end = timestamp - math.get_symbol_time() * 0.5
 
-        subset = (self.mm.mq.loc[
-            (self.mm.mq.modulation == modulation) &
-            (self.mm.mq.band == band) &
-            (self.mm.mq.tx_end >= cad_start) &
-            (self.mm.mq.tx_start <= cad_end)
-            ]).copy()
-
-        if len(subset):
-            subset.loc[:, 'reachable'] = subset.apply(mark_reachable_message, axis=1)
-            subset = subset.loc[subset.reachable == True]
-
-            if len(subset):
-                subset.loc[:, 'rx_power'] = subset.apply(calc_power_message, axis=1)
-
-                self.network.tracer.log_activity(
-                    CADActivity(cad_start, timestamp, rx_node, RadioConfiguration.rx_energy(timestamp - cad_start),
-                                modulation, True),
-                )
-
-                return subset.rx_power.max()
+        subset = self.mm.mq.overlapping(cad_start, cad_end, modulation=modulation, band=band)
+        subset = subset.select(self.get_reachable(modulation, rx_node, subset))
 
-            else:
+        self.network.tracer.log_activity(
+            CADActivity(cad_start, timestamp, rx_node, RadioConfiguration.rx_energy(timestamp - cad_start),
+                        modulation, bool(len(subset))),
+        )
 
-                self.network.tracer.log_activity(
-                    CADActivity(cad_start, timestamp, rx_node, RadioConfiguration.rx_energy(timestamp - cad_start),
-                                modulation, False),
-                )
-
-                return None
+        if len(subset):
+            return np.max(self.get_rx_powers(rx_node, subset))
         else:
+            return None
 
-            self.network.tracer.log_activity(
-                CADActivity(cad_start, timestamp, rx_node, RadioConfiguration.rx_energy(timestamp - cad_start),
-                            modulation, False),
-            )
+    def get_rx_powers(self, rx_node: 'sim_node.SimNode', transmissions: SimTransmissionSet):
+        return -self.network.path_loss_matrix[rx_node.id, transmissions['source_id']] + transmissions['power']
 
-            return None
+    def get_reachable(self, modulation, rx_node: 'sim_node.SimNode', transmissions: SimTransmissionSet):
+        return self.network.reachability[modulation, self.network.get_power_levels(transmissions['power']),
+                                         rx_node.id, transmissions['source_id']]
+
+    @staticmethod
+    def outside_same_flood_window(transmissions: SimTransmissionSet, tx_start):
+        return ~(((tx_start - SAME_FLOOD_WINDOW) < transmissions['tx_start'])
+                 & (transmissions['tx_start'] < (tx_start + SAME_FLOOD_WINDOW)))
 
     def calculate_path_loss(self, node_a: 'sim_node.SimNode', node_b: 'sim_node.SimNode'):
-        if node_a is not node_b:
-            return self.network.G[node_a.id][node_b.id]['path_loss']
-        else:
-            return 0
+        return self.network.path_loss_matrix[node_a.id, node_b.id]
 
     def is_reachable(self, modulation, node_a: 'sim_node.SimNode', node_b: 'sim_node.SimNode', power=22):
-        config = RadioConfiguration(modulation)
-        math = RadioMath(config)
-        pl = self.calculate_path_loss(node_a, node_b)
-
-        if pl <= math.link_budget(power=power):
-            return True
+        if power in lwb_slot.RADIO_POWERS:
+            return bool(self.network.reachability[modulation, lwb_slot.RADIO_POWERS.index(power), node_a.id, node_b.id])
         else:
-            return False
+            return self.calculate_path_loss(node_a, node_b) <= RadioMath(
+                get_radio_configuration(modulation)).link_budget(power=power)
@@ -1,23 +1,29 @@
 from copy import copy
 
-import pandas as pd
-
+import flora_tools.gloria as gloria
 import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_event_manager as sim_event_type
 import flora_tools.sim.sim_network as sim_network
 import flora_tools.sim.sim_node as sim_node
-from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.radio_configuration import RadioConfiguration, get_radio_configuration
+from flora_tools.radio_math import RadioMath
 from flora_tools.sim.sim_message import SimMessage, SimMessageType
 from flora_tools.sim.sim_tracer import TxActivity
+from flora_tools.sim.sim_transmission_store import SimTransmissionStore
+
+KEEP_QUIET_MARGIN = 100E-6
 
 
 class SimMessageManager:
     def __init__(self, network: 'sim_network.SimNetwork'):
         self.network = network
-        self.mq = pd.DataFrame(
-            columns=['source', 'modulation', 'band', 'power', 'tx_start', 'tx_end', 'message', 'message_hash'])
-        self.rxq = pd.DataFrame(
-            columns=['rx_node', 'modulation', 'band', 'rx_start', 'callback'])
+        self.mq = SimTransmissionStore()
+        self.rx_registry = {}  # (modulation, band) -> {node id: [rx_node, modulation, band, rx_start, callback]}
+        self.rx_bands = {}  # node id -> (modulation, band) of its registered receiver
+        self.rx_windows = {}  # node id -> [rx_start, closing timestamp or None], bounds the transmission pruning
+        # (modulation, band) -> {node id: [rx_node, wakeup callback, trace callback]} of fast-forwarded scans
+        self.idle_registry = {}
+        self.max_reception_delay = None
 
     def tx(self, source: 'sim_node.SimNode', modulation, band, message: SimMessage):
         power = lwb_slot.RADIO_POWERS[message.power_level]
@@ -26,14 +32,10 @@ class SimMessageManager:
         message.hop_count += 1
         message.tx_start = source.transform_local_to_global_timestamp(message.timestamp)
 
-        self.mq.loc[len(self.mq)] = [source,
-                                     modulation,
-                                     band,
-                                     power,
-                                     message.tx_start,
-                                     message.tx_end,
-                                     message,
-                                     message.hash]
+        if self.mq.needs_pruning:
+            self.mq.prune(self.get_transmission_horizon())
+
+        self.mq.append(source, modulation, band, power, message.tx_start, message.tx_end, message, message.key)
 
         self.network.tracer.log_activity(
             TxActivity(message.tx_start, message.tx_end, source,
@@ -41,37 +43,88 @@ class SimMessageManager:
                        ack=(message.type is SimMessageType.GLORIA_ACK))
         )
 
-        for rx_node_item_index, rx_node_item in self.rxq.iterrows():
-            if (rx_node_item is not None and
-                    rx_node_item['rx_start'] < message.tx_start and
-                    rx_node_item['modulation'] is modulation and
-                    rx_node_item['band'] is band):
-                self.network.em.register_event(
-                    message.tx_end,
-                    rx_node_item['rx_node'],
-                    sim_event_type.SimEventType.TX_DONE_BEFORE_RX_TIMEOUT,
-                    rx_node_item['callback'],
-                    {'source': source, 'message': message, 'rx': rx_node_item},
-                    local=False)
+        receivers = self.rx_registry.get((modulation, band))
+        if receivers:
+            # Receivers that can not hear the message would discard it anyway, they do not get any event
+            reachable = self.network.reachability[modulation, message.power_level, :, message.source.id]
+            for rx_node_id, rx_item in list(receivers.items()):
+                if rx_item[3] < message.tx_start and reachable[rx_node_id]:
+                    self.network.em.register_event(
+                        message.tx_end,
+                        rx_item[0],
+                        sim_event_type.SimEventType.TX_DONE_BEFORE_RX_TIMEOUT,
+                        rx_item[4],
+                        {'source': source, 'message': message, 'rx': rx_item},
+                        local=False)
+
+        scanners = self.idle_registry.get((modulation, band))
+        if scanners:
+            # Fast-forwarded scans resume as soon as a transmission they could detect enters the store. CAD and RX
+            # timeouts consider the transmitting node, receptions on TX done the message's source.
+            reachable = (self.network.reachability[modulation, message.power_level, :, source.id]
+                         | self.network.reachability[modulation, message.power_level, :, message.source.id])
+            for rx_node_id, (rx_node, callback, _) in list(scanners.items()):
+                if reachable[rx_node_id]:
+                    callback()
 
     def register_rx(self, rx_node: 'sim_node.SimNode', rx_start: float, modulation: int, band: int, callback):
         rx_start_global = rx_node.transform_local_to_global_timestamp(rx_start)
-        self.rxq.loc[rx_node.id, :] = [rx_node, modulation, band, rx_start_global, callback]
+        rx_item = [rx_node, modulation, band, rx_start_global, callback]
+
+        if self.rx_bands.get(rx_node.id, (modulation, band)) != (modulation, band):
+            del self.rx_registry[self.rx_bands[rx_node.id]][rx_node.id]
+        self.rx_registry.setdefault((modulation, band), {})[rx_node.id] = rx_item
+        self.rx_bands[rx_node.id] = (modulation, band)
+        self.rx_windows[rx_node.id] = [rx_start_global, None]
 
-        future_transmissions = self.mq.loc[self.mq.tx_start > rx_start_global]
-        for future_transmission_idx, future_transmission in future_transmissions.iterrows():
-            if (future_transmission['modulation'] is modulation and
-                    future_transmission['band'] is band):
+        future_transmissions = self.mq.starting_after(rx_start_global, modulation=modulation, band=band)
+        for source, tx_end, message in zip(future_transmissions['source'], future_transmissions['tx_end'],
+                                           future_transmissions['message']):
+            if self.network.reachability[modulation, message.power_level, rx_node.id, message.source.id]:
                 self.network.em.register_event(
-                    future_transmission['tx_end'],
+                    tx_end,
                     rx_node,
                     sim_event_type.SimEventType.TX_DONE_BEFORE_RX_TIMEOUT,
                     callback,
-                    {'message': future_transmission['message'],
-                     'rx': [rx_node, modulation, band, rx_start_global, callback]},
+                    {'source': source, 'message': message, 'rx': rx_item},
                     local=False)
 
     def unregister_rx(self, rx_node: 'sim_node.SimNode'):
         self.network.em.remove_all_events(rx_node, sim_event_type.SimEventType.TX_DONE_BEFORE_RX_TIMEOUT)
         self.network.em.remove_all_events(rx_node, sim_event_type.SimEventType.RX_TIMEOUT)
-        self.rxq = self.rxq.drop(rx_node.id)
+        del self.rx_registry[self.rx_bands.pop(rx_node.id)][rx_node.id]
+        if rx_node.id in self.rx_windows:
+            self.rx_windows[rx_node.id][1] = self.network.global_timestamp
+
+    def register_idle(self, rx_node: 'sim_node.SimNode', modulations, band: int, callback, trace_callback):
+        for modulation in modulations:
+            self.idle_registry.setdefault((modulation, band), {})[rx_node.id] = [rx_node, callback, trace_callback]
+
+    def unregister_idle(self, rx_node: 'sim_node.SimNode'):
+        for scanners in self.idle_registry.values():
+            scanners.pop(rx_node.id, None)
+
+    def trace_idle(self):
+        trace_callbacks = {}
+        for scanners in self.idle_registry.values():
+            for rx_node_id, (_, _, trace_callback) in scanners.items():
+                trace_callbacks[rx_node_id] = trace_callback
+
+        for trace_callback in trace_callbacks.values():
+            trace_callback()
+
+    def get_transmission_horizon(self):
+        # A closed RX window is still evaluated until its RX_DONE, which happens at most one packet plus the RX end
+        # offset after closing. Transmissions that ended before every such window can not influence any reception.
+        if self.max_reception_delay is None:
+            self.max_reception_delay = max(
+                RadioMath(get_radio_configuration(modulation)).get_message_toa(payload_size=255)
+                + gloria.get_gloria_timings(modulation).rx_end_offset
+                for modulation in lwb_slot.RADIO_MODULATIONS)
+
+        horizon = self.network.global_timestamp - self.max_reception_delay
+        for rx_start, closed in self.rx_windows.values():
+            if closed is None or closed >= horizon:
+                horizon = min(horizon, rx_start)
+
+        return horizon - KEEP_QUIET_MARGIN
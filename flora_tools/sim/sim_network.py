@@ -1,3 +1,6 @@
+import gzip
+import os
+import pickle
 from itertools import combinations
 from typing import List
 
@@ -5,48 +8,147 @@ import networkx as nx
 import numpy as np
 
 import flora_tools.flocklab.measure_links as fl
+import flora_tools.lwb_slot as lwb_slot
 import flora_tools.sim.sim_event_manager as sim_event_manager
 import flora_tools.sim.sim_node as sim_node
-from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.radio_configuration import RADIO_CONFIGURATIONS, get_radio_configuration
 from flora_tools.radio_math import RadioMath
 from flora_tools.sim.sim_message_channel import SimMessageChannel
 from flora_tools.sim.sim_message_manager import SimMessageManager
+from flora_tools.sim.sim_topology import SpatialTopology, SparsePathLossMatrix, SparseReachability
 from flora_tools.sim.sim_tracer import SimTracer
 
 FLOCKLAB_BASE = 31
+LINK_MATRIX_DENSE_LIMIT = 1024  # Networks with larger node ids use sparse link matrices
 
 
 class SimNetwork:
     def __init__(self, output_path, node_count=5, event_count: int = None,
-                 time_limit: float = None, path_loss=[90, 140], seed: int = 0, flocklab: bool = False):
+                 time_limit: float = None, path_loss=[90, 140], seed: int = 0, flocklab: bool = False,
+                 event_history: 'sim_event_manager.EventHistoryPolicy' = None, spatial: bool = False,
+                 dimensions: int = 2, fast_forward_sync: bool = False):
+        if event_history is None:
+            event_history = sim_event_manager.EventHistoryPolicy.RING
         self.global_timestamp = 0
+        self.started = False
+        self.fast_forward_sync = fast_forward_sync  # Unsynchronized nodes skip scans of an idle channel
 
         self.tracer = SimTracer(self, output_path)
 
         self.mm = SimMessageManager(self)
         self.mc = SimMessageChannel(self)
-        self.em = sim_event_manager.SimEventManager(self, event_count=event_count, time_limit=time_limit)
+        self.em = sim_event_manager.SimEventManager(
+            self, event_count=event_count, time_limit=time_limit, history=event_history,
+            history_path=(os.path.join(output_path, sim_event_manager.EVENT_HISTORY_FILE)
+                          if output_path is not None else None))
 
         self.nodes: List[sim_node.SimNode] = []
-        self.G: nx.Graph = None
+        self._G: nx.Graph = None
         self.pos = None
+        self.topology: SpatialTopology = None
+
+        self._path_loss_matrix: np.ndarray = None
+        self._reachability: np.ndarray = None
+        self.link_budgets = np.array([[RadioMath(get_radio_configuration(modulation)).link_budget(power=power)
+                                       for power in lwb_slot.RADIO_POWERS]
+                                      for modulation in range(len(RADIO_CONFIGURATIONS))])
 
         self.flocklab = flocklab
         if flocklab:
             self.flocklab_graph()
+        elif spatial:
+            self.spatial_graph(node_count, seed, dimensions)
         else:
             self.random_graph(node_count, path_loss, seed)
 
+    @property
+    def G(self) -> nx.Graph:
+        return self._G
+
+    @G.setter
+    def G(self, graph: nx.Graph):
+        self._G = graph
+        self.invalidate_link_matrices()
+
+    @property
+    def path_loss_matrix(self) -> np.ndarray:
+        # Indexed by node id, unconnected node pairs have an infinite path loss
+        if self._path_loss_matrix is None:
+            size = max(self.G.nodes) + 1 if len(self.G) else 0
+            if size > LINK_MATRIX_DENSE_LIMIT:
+                edges = list(self.G.edges.data('path_loss'))
+                self._path_loss_matrix = SparsePathLossMatrix(
+                    size, [u for (u, v, pl) in edges], [v for (u, v, pl) in edges],
+                    np.array([pl for (u, v, pl) in edges], dtype=float))
+            else:
+                self._path_loss_matrix = np.full((size, size), np.inf)
+                np.fill_diagonal(self._path_loss_matrix, 0)
+                for (u, v, pl) in self.G.edges.data('path_loss'):
+                    self._path_loss_matrix[u, v] = pl
+                    self._path_loss_matrix[v, u] = pl
+
+        return self._path_loss_matrix
+
+    @property
+    def reachability(self) -> np.ndarray:
+        # Indexed by [modulation, power level, rx node id, tx node id]
+        if self._reachability is None:
+            if isinstance(self.path_loss_matrix, SparsePathLossMatrix):
+                self._reachability = SparseReachability(self.path_loss_matrix, self.link_budgets)
+            else:
+                self._reachability = (self.path_loss_matrix[np.newaxis, np.newaxis, :, :]
+                                      <= self.link_budgets[:, :, np.newaxis, np.newaxis])
+
+        return self._reachability
+
+    def invalidate_link_matrices(self):
+        # Has to be called after modifying the graph G in place
+        self._path_loss_matrix = None
+        self._reachability = None
+
+    def build_link_matrices(self):
+        self.invalidate_link_matrices()
+        return self.reachability
+
+    def get_power_levels(self, powers):
+        return np.searchsorted(lwb_slot.RADIO_POWERS, powers)
+
     def run(self):
-        for node in self.nodes:
-            node.run()
+        if not self.started:
+            for node in self.nodes:
+                node.run()
+            self.started = True
 
         self.em.loop()
+        self.mm.trace_idle()  # Scans still fast-forwarded at the end of the run
+
+    def save_snapshot(self, path):
+        self.tracer.flush()
+
+        with gzip.open(path, "wb") as snapshot_file:
+            pickle.dump({'network': self, 'random_state': np.random.get_state()}, snapshot_file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load_snapshot(path, output_path, event_count: int = None, time_limit: float = None) -> 'SimNetwork':
+        with gzip.open(path, "rb") as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+
+        np.random.set_state(snapshot['random_state'])
+
+        network: SimNetwork = snapshot['network']
+        network.em.event_count = event_count
+        network.em.time_limit = time_limit
+        network.tracer.restart(output_path)
+        network.em.restart_history(
+            os.path.join(output_path, sim_event_manager.EVENT_HISTORY_FILE) if output_path is not None else None)
+
+        return network
 
     def draw(self, modulation=None, power=22):
         if modulation is not None:
             H = self.G.copy()
-            config = RadioConfiguration(modulation)
+            config = get_radio_configuration(modulation)
             math = RadioMath(config)
             edges_to_remove = []
             for (u, v, pl) in H.edges.data('path_loss'):
@@ -55,12 +157,12 @@ class SimNetwork:
 
             H.remove_edges_from(edges_to_remove)
 
-            config = RadioConfiguration(modulation)
+            config = get_radio_configuration(modulation)
 
             if self.pos is None:
                 pos = nx.spring_layout(H)
             else:
-                pos = self.pos
+                pos = {id: position[0:2] for id, position in self.pos.items()}
             edge_labels = dict([((u, v), "{:.2f}".format(d['path_loss'])) for u, v, d in H.edges(data=True)])
             nx.draw(H, with_labels=True, node_size=500, node_color=config.color, font_color='white', pos=pos)
             nx.draw_networkx_edge_labels(H, pos=pos, edge_labels=edge_labels)
@@ -68,7 +170,7 @@ class SimNetwork:
             if self.pos is None:
                 pos = nx.spring_layout(self.G)
             else:
-                pos = self.pos
+                pos = {id: position[0:2] for id, position in self.pos.items()}
 
             edge_labels = dict([((u, v), "{:.2f}".format(d['path_loss'])) for u, v, d in self.G.edges(data=True)])
             nx.draw(self.G, with_labels=True, node_size=500, node_color='black', font_color='white', pos=pos)
@@ -88,6 +190,23 @@ class SimNetwork:
         channels = [tuple([edge[0], edge[1], {'path_loss': path_losses[index]}]) for index, edge in enumerate(edges)]
 
         self.G.add_edges_from(channels)
+        self.build_link_matrices()
+
+    def spatial_graph(self, node_count, seed, dimensions=2):
+        self.nodes = [sim_node.SimNode(self, mm=self.mm, em=self.em, id=i, role=(
+            sim_node.SimNodeRole.SENSOR if i is not 0 else sim_node.SimNodeRole.BASE))
+                      for i in range(node_count)]
+
+        np.random.seed(seed)
+        self.topology = SpatialTopology(node_count, np.max(self.link_budgets), dimensions=dimensions)
+        positions, sources, targets, path_losses = self.topology.generate()
+        self.pos = {id: position for id, position in enumerate(positions.tolist())}
+
+        G = nx.Graph()
+        G.add_nodes_from(range(node_count))
+        G.add_weighted_edges_from(zip(sources.tolist(), targets.tolist(), path_losses.tolist()), weight='path_loss')
+        self.G = G
+        self.build_link_matrices()
 
     def flocklab_graph(self):
         self.nodes = [sim_node.SimNode(self, mm=self.mm, em=self.em, id=id, role=(
@@ -95,3 +214,4 @@ class SimNetwork:
                       for id in fl.FLOCKLAB_TARGET_ID_LIST]
         self.G = nx.Graph()
         self.G.add_nodes_from(fl.FLOCKLAB_TARGET_ID_LIST)
+        self.build_link_matrices()
@@ -0,0 +1,20 @@
+from enum import Enum
+
+# Option values shared by the simulator and the CLI. This module must not import anything heavy, the CLI parses its
+# arguments before it loads the subsystem of a subcommand.
+
+SIM_LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+BENCHMARK_REPEAT = 3
+
+
+class EventHistoryPolicy(Enum):
+    NONE = 'none'  # Processed events are not kept
+    RING = 'ring'  # The last sim_event_manager.EVENT_HISTORY_SIZE processed events are kept
+    SPILL = 'spill'  # All processed events are appended to a CSV file as compact rows
+    ALL = 'all'  # All processed events are kept in memory
+
+    def __str__(self):
+        return '{0}'.format(self.value)
+
+
+EVENT_HISTORY_POLICIES = [str(policy) for policy in EventHistoryPolicy]
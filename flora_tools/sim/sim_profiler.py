@@ -0,0 +1,81 @@
+import json
+import os
+import time
+
+import pandas as pd
+
+import flora_tools.sim.sim_event_manager as sim_event_manager
+import flora_tools.sim.sim_network as sim_network
+
+PROFILER_SAMPLE_INTERVAL = 100  # Events between two samples of the queue sizes
+PROFILE_COLUMNS = ['callback', 'event_type', 'count', 'total_time', 'mean_time', 'max_time', 'share']
+SAMPLE_COLUMNS = ['event', 'timestamp', 'event_queue', 'message_queue']
+
+
+class SimProfiler:
+    def __init__(self, network: 'sim_network.SimNetwork', sample_interval: int = PROFILER_SAMPLE_INTERVAL):
+        self.network = network
+        self.sample_interval = sample_interval
+
+        self.callbacks = {}  # (callback, event_type) -> [count, total_time, max_time]
+        self.samples = []
+        self.event_count = 0
+        self.total_time = 0.0  # Spent in the event callbacks
+        self.loop_time = 0.0  # Spent in the event loop, including queue handling and logging
+
+    @staticmethod
+    def timer():
+        return time.perf_counter()
+
+    def record(self, event: 'sim_event_manager.SimEvent', elapsed: float):
+        key = (event.callback.__qualname__, str(event.type))
+        entry = self.callbacks.get(key)
+        if entry is None:
+            self.callbacks[key] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+        self.total_time += elapsed
+
+        if self.event_count % self.sample_interval == 0:
+            self.samples.append([self.event_count, self.network.global_timestamp, len(self.network.em),
+                                 len(self.network.mm.mq)])
+        self.event_count += 1
+
+    def record_iteration(self, elapsed: float):
+        self.loop_time += elapsed
+
+    def get_summary(self) -> pd.DataFrame:
+        rows = [[callback, event_type, count, total_time, total_time / count, max_time,
+                 (total_time / self.total_time if self.total_time else 0.0)]
+                for (callback, event_type), (count, total_time, max_time) in self.callbacks.items()]
+        return pd.DataFrame(rows, columns=PROFILE_COLUMNS).sort_values('total_time', ascending=False)
+
+    def get_event_type_summary(self) -> pd.DataFrame:
+        summary = self.get_summary()
+        return summary.groupby('event_type')[['count', 'total_time']].sum().sort_values('total_time', ascending=False)
+
+    def get_samples(self) -> pd.DataFrame:
+        return pd.DataFrame(self.samples, columns=SAMPLE_COLUMNS)
+
+    def print_summary(self):
+        print("Profiled {} events: {:f} s in callbacks, {:f} s event loop overhead".format(
+            self.event_count, self.total_time, max(self.loop_time - self.total_time, 0.0)))
+        print(self.get_summary().to_string(index=False))
+        print(self.get_event_type_summary().to_string())
+
+    def export(self, output_path):
+        self.get_summary().to_csv(os.path.join(output_path, "sim_profile.csv"), index=False)
+        self.get_samples().to_csv(os.path.join(output_path, "sim_profile_samples.csv"), index=False)
+
+        with open(os.path.join(output_path, "sim_profile.json"), "w") as write_file:
+            json.dump({
+                'event_count': self.event_count,
+                'total_time': self.total_time,
+                'loop_time': self.loop_time,
+                'callbacks': self.get_summary().to_dict(orient='records'),
+                'samples': self.get_samples().to_dict(orient='records'),
+            }, write_file, indent=4)
@@ -0,0 +1,127 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+import flora_tools.sim.sim_node as sim_node
+from flora_tools.sim.sim import Sim
+from flora_tools.sim.sim_tracer import TraceEventType
+
+RADIO_ACTIVITIES = ['TxActivity', 'RxActivity', 'CADActivity']  # Slot/round activities only span radio activities
+
+
+class SimSweep:
+    def __init__(self, output_path, seeds=[0], node_counts=[5], path_losses=[[90, 140]], event_count: int = None,
+                 time_limit: float = None, topologies=['random'], workers: int = None, dimensions: int = 2):
+        self.output_path = output_path
+        self.event_count = event_count
+        self.time_limit = time_limit
+        self.workers = workers
+
+        self.points = []
+        for topology in topologies:
+            if topology == 'flocklab':
+                # Node count and path losses are given by the FlockLab topology
+                grid = product(seeds, [None], [None])
+            elif topology == 'spatial':
+                # Path losses are given by the node placement
+                grid = product(seeds, node_counts, [None])
+            else:
+                grid = product(seeds, node_counts, path_losses)
+
+            for seed, node_count, path_loss in grid:
+                self.points.append({
+                    'topology': topology,
+                    'seed': seed,
+                    'node_count': node_count,
+                    'path_loss_min': path_loss[0] if path_loss is not None else None,
+                    'path_loss_max': path_loss[1] if path_loss is not None else None,
+                    'dimensions': dimensions if topology == 'spatial' else None,
+                    'event_count': event_count,
+                    'time_limit': time_limit,
+                })
+
+    def run(self) -> pd.DataFrame:
+        for index, point in enumerate(self.points):
+            point['output_path'] = os.path.join(self.output_path, "run{:04d}".format(index))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            rows = list(executor.map(SimSweep.run_point, self.points))
+
+        summary = pd.DataFrame(rows)
+        summary.to_csv(os.path.join(self.output_path, "sweep_summary.csv"), index=False)
+        return summary
+
+    @staticmethod
+    def run_point(point):
+        os.makedirs(point['output_path'], exist_ok=True)
+
+        # A single failing run must not abort the whole sweep, its row only records the error
+        row = dict(point)
+        row['error'] = None
+        sim = None
+        try:
+            if point['topology'] == 'flocklab':
+                sim = Sim(output_path=point['output_path'], event_count=point['event_count'],
+                          time_limit=point['time_limit'], seed=point['seed'], flocklab=True)
+            elif point['topology'] == 'spatial':
+                sim = Sim(output_path=point['output_path'], event_count=point['event_count'],
+                          time_limit=point['time_limit'], seed=point['seed'], node_count=point['node_count'],
+                          spatial=True, dimensions=point['dimensions'])
+            else:
+                sim = Sim(output_path=point['output_path'], event_count=point['event_count'],
+                          time_limit=point['time_limit'], seed=point['seed'], node_count=point['node_count'],
+                          path_loss=[point['path_loss_min'], point['path_loss_max']])
+            sim.run()
+        except Exception as e:
+            row['error'] = repr(e)
+
+        if sim is not None:
+            try:
+                row.update(SimSweep.summarize(sim))
+            except Exception as e:
+                if row['error'] is None:
+                    row['error'] = repr(e)
+        return row
+
+    @staticmethod
+    def summarize(sim: Sim):
+        network = sim.network
+        tracer = network.tracer
+
+        energies = {node.id: 0.0 for node in network.nodes}
+        for activity in tracer.iter_activities():
+            if activity['activity_type'] in RADIO_ACTIVITIES:
+                energies[activity['node']] += activity['energy']
+
+        delivered = 0
+        lost = 0
+        first_sync = {}
+        for event in tracer.iter_events():
+            if event['event_type'] == str(TraceEventType.DATA_DELIVERED):
+                delivered += 1
+            elif event['event_type'] == str(TraceEventType.DATA_LOST):
+                lost += 1
+            elif event['event_type'] == str(TraceEventType.SYNC) and event['node'] not in first_sync:
+                first_sync[event['node']] = event['marker']
+
+        sync_nodes = [node.id for node in network.nodes if node.role is not sim_node.SimNodeRole.BASE]
+        sync_latencies = [first_sync[id] for id in sync_nodes if id in first_sync]
+
+        summary = {
+            'simulated_time': network.global_timestamp,
+            'data_delivered': delivered,
+            'data_lost': lost,
+            'pdr': delivered / (delivered + lost) if (delivered + lost) else np.nan,
+            'synced_nodes': len(sync_latencies),
+            'unsynced_nodes': len(sync_nodes) - len(sync_latencies),
+            'sync_latency_mean': np.mean(sync_latencies) if sync_latencies else np.nan,
+            'sync_latency_max': np.max(sync_latencies) if sync_latencies else np.nan,
+            'energy_mean': np.mean(list(energies.values())) if energies else np.nan,
+        }
+        for id, energy in energies.items():
+            summary['energy_node{}'.format(id)] = energy
+
+        return summary
@@ -0,0 +1,173 @@
+from itertools import product
+
+import numpy as np
+
+import flora_tools.radio_math as radio_math
+
+TOPOLOGY_WAVELENGTH = 300E6 / 868E6  # [m]
+TOPOLOGY_REFERENCE_DISTANCE = 1.0  # [m]
+# Free-space path loss at the reference distance
+TOPOLOGY_REFERENCE_PATH_LOSS = 20 * np.log10(4 * np.pi * TOPOLOGY_REFERENCE_DISTANCE / TOPOLOGY_WAVELENGTH)
+TOPOLOGY_PATH_LOSS_EXPONENT = 2 * radio_math.PATH_LOSS_EXPONENT_FACTOR
+TOPOLOGY_SHADOWING = 6.0  # Standard deviation of the log-normal shadowing [dB]
+TOPOLOGY_SHADOWING_MARGIN = 3.0  # Standard deviations of shadowing considered by the distance cutoff
+TOPOLOGY_INTERFERENCE_MARGIN = 6.0  # Links this far beyond the maximum link budget are still kept as interferers [dB]
+TOPOLOGY_NEIGHBOR_COUNT = 8  # Mean number of nodes within the mean range of the maximum link budget
+
+
+def get_neighbor_pairs(positions: np.ndarray, cutoff: float):
+    # Grid with cells of the cutoff size, so every pair within the cutoff lies in the same or in adjacent cells.
+    # Only half of the adjacent cells are visited per cell, which yields every pair exactly once.
+    dimensions = positions.shape[1]
+    cells = np.floor(positions / cutoff).astype(np.int64)
+
+    order = np.lexsort(cells.T[::-1])
+    sorted_cells = cells[order]
+    boundaries = np.flatnonzero(np.any(np.diff(sorted_cells, axis=0), axis=1)) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.concatenate([boundaries, [len(order)]])
+    grid = {tuple(sorted_cells[start]): order[start:end] for start, end in zip(starts, ends)}
+
+    offsets = [offset for offset in product([-1, 0, 1], repeat=dimensions) if offset > (0,) * dimensions]
+
+    sources = []
+    targets = []
+    distances = []
+    for cell, members in grid.items():
+        first, second = np.triu_indices(len(members), k=1)
+        candidates = [(members[first], members[second])]
+
+        for offset in offsets:
+            others = grid.get(tuple(np.add(cell, offset)))
+            if others is not None:
+                candidates.append((np.repeat(members, len(others)), np.tile(others, len(members))))
+
+        for u, v in candidates:
+            distance = np.linalg.norm(positions[u] - positions[v], axis=1)
+            mask = distance <= cutoff
+            sources.append(u[mask])
+            targets.append(v[mask])
+            distances.append(distance[mask])
+
+    if not sources:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    return np.concatenate(sources), np.concatenate(targets), np.concatenate(distances)
+
+
+class SpatialTopology:
+    # Places nodes uniformly in a square (2D) or cube (3D) and derives the path losses from a log-distance model with
+    # log-normal shadowing. Pairs that can neither communicate nor interfere are omitted, so the resulting links are
+    # sparse and the generation scales with the number of links instead of the number of node pairs.
+    def __init__(self, node_count: int, max_link_budget: float, dimensions: int = 2, size: float = None,
+                 path_loss_exponent: float = TOPOLOGY_PATH_LOSS_EXPONENT,
+                 reference_path_loss: float = TOPOLOGY_REFERENCE_PATH_LOSS, shadowing: float = TOPOLOGY_SHADOWING,
+                 interference_margin: float = TOPOLOGY_INTERFERENCE_MARGIN,
+                 neighbor_count: float = TOPOLOGY_NEIGHBOR_COUNT):
+        if dimensions not in [2, 3]:
+            raise ValueError("Only 2D and 3D topologies are supported")
+
+        self.node_count = node_count
+        self.max_link_budget = max_link_budget
+        self.dimensions = dimensions
+        self.path_loss_exponent = path_loss_exponent
+        self.reference_path_loss = reference_path_loss
+        self.shadowing = shadowing
+        self.interference_margin = interference_margin
+
+        if size is None:
+            # Keeps the node density constant, i.e. large deployments become multi-hop instead of denser
+            volume = (np.pi if dimensions == 2 else 4 / 3 * np.pi) * self.get_distance(max_link_budget) ** dimensions
+            size = np.power(volume * node_count / neighbor_count, 1 / dimensions)
+        self.size = size
+
+    def get_path_loss(self, distance):
+        distance = np.maximum(distance, TOPOLOGY_REFERENCE_DISTANCE)
+        return self.reference_path_loss + 10 * self.path_loss_exponent * np.log10(
+            distance / TOPOLOGY_REFERENCE_DISTANCE)
+
+    def get_distance(self, path_loss):
+        return TOPOLOGY_REFERENCE_DISTANCE * np.power(
+            10, (path_loss - self.reference_path_loss) / (10 * self.path_loss_exponent))
+
+    @property
+    def max_path_loss(self):
+        return self.max_link_budget + self.interference_margin
+
+    @property
+    def cutoff(self):
+        return self.get_distance(self.max_path_loss + TOPOLOGY_SHADOWING_MARGIN * self.shadowing)
+
+    def generate(self):
+        # Uses the global NumPy random state, like the other topologies of SimNetwork
+        positions = np.random.uniform(0, self.size, (self.node_count, self.dimensions))
+        if self.node_count:
+            positions[0] = self.size / 2  # Base in the center
+
+        sources, targets, distances = get_neighbor_pairs(positions, self.cutoff)
+        path_losses = self.get_path_loss(distances) + np.random.normal(0, self.shadowing, len(distances))
+
+        mask = path_losses <= self.max_path_loss
+        return positions, sources[mask], targets[mask], path_losses[mask]
+
+
+class SparsePathLossMatrix:
+    # Drop-in for the dense path loss matrix of SimNetwork. Supports the same (rx, tx) indexing with integers, integer
+    # arrays and full slices. Pairs without a link have an infinite path loss, the diagonal is zero.
+    def __init__(self, size: int, sources, targets, path_losses):
+        self.size = size
+
+        nodes = np.arange(size, dtype=np.int64)
+        rx = np.concatenate([np.asarray(sources, dtype=np.int64), np.asarray(targets, dtype=np.int64), nodes])
+        tx = np.concatenate([np.asarray(targets, dtype=np.int64), np.asarray(sources, dtype=np.int64), nodes])
+        values = np.concatenate([path_losses, path_losses, np.zeros(size)])
+
+        keys = rx * size + tx
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.values = values[order]
+
+    @property
+    def shape(self):
+        return self.size, self.size
+
+    def __len__(self):
+        return self.size
+
+    def get_row(self, rx: int):
+        start, end = np.searchsorted(self.keys, [rx * self.size, (rx + 1) * self.size])
+        row = np.full(self.size, np.inf)
+        row[self.keys[start:end] - rx * self.size] = self.values[start:end]
+        return row
+
+    def __getitem__(self, key):
+        rx, tx = key
+
+        # Symmetric, a column equals the row of the same node
+        if isinstance(rx, slice) and rx == slice(None):
+            return self.get_row(int(tx)) if np.ndim(tx) == 0 else self.get_row_set(tx).T
+        if isinstance(tx, slice) and tx == slice(None):
+            return self.get_row(int(rx)) if np.ndim(rx) == 0 else self.get_row_set(rx)
+
+        flat = np.asarray(rx, dtype=np.int64) * self.size + np.asarray(tx, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.keys, flat), len(self.keys) - 1)
+        found = self.keys[positions] == flat
+        return np.where(found, self.values[positions], np.inf)[()]
+
+    def get_row_set(self, rows):
+        return np.array([self.get_row(int(row)) for row in rows])
+
+
+class SparseReachability:
+    # Drop-in for the dense reachability matrix, indexed by [modulation, power level, rx node id, tx node id]
+    def __init__(self, path_loss_matrix: SparsePathLossMatrix, link_budgets: np.ndarray):
+        self.path_loss_matrix = path_loss_matrix
+        self.link_budgets = link_budgets
+
+    @property
+    def shape(self):
+        return self.link_budgets.shape + self.path_loss_matrix.shape
+
+    def __getitem__(self, key):
+        modulation, power_level, rx, tx = key
+        return self.path_loss_matrix[rx, tx] <= self.link_budgets[modulation, power_level]
@@ -0,0 +1,61 @@
+import json
+import os
+from typing import Dict, List
+
+TRACE_CHUNK_SIZE = 4096  # Records buffered in memory before a chunk gets flushed
+DICTIONARY_COLUMNS = ['activity_type', 'event_type', 'node']
+
+
+class SimTraceWriter:
+    # Appends chunks of trace records to a NDJSON file. Every line is a single columnar chunk of one kind
+    # ('activities' or 'events'), low cardinality columns are dictionary-encoded per chunk.
+    def __init__(self, path):
+        self.path = path
+        self.chunk_count = 0
+
+        with open(self.path, "w"):
+            pass
+
+    def write_chunk(self, kind: str, records: List[Dict]):
+        if not records:
+            return
+
+        columns = {}
+        for column in records[0].keys():
+            values = [record[column] for record in records]
+            if column in DICTIONARY_COLUMNS:
+                dictionary = list(dict.fromkeys(values))
+                indices = {value: index for index, value in enumerate(dictionary)}
+                columns[column] = {'dictionary': dictionary, 'indices': [indices[value] for value in values]}
+            else:
+                columns[column] = values
+
+        with open(self.path, "a") as chunk_file:
+            chunk_file.write(json.dumps({'kind': kind, 'count': len(records), 'columns': columns}) + "\n")
+            chunk_file.flush()
+
+        self.chunk_count += 1
+
+    def read_chunks(self, kind: str = None):
+        with open(self.path, "r") as chunk_file:
+            for line in chunk_file:
+                chunk = json.loads(line)
+                if kind is None or chunk['kind'] == kind:
+                    yield chunk
+
+    def read_records(self, kind: str):
+        for chunk in self.read_chunks(kind):
+            columns = {}
+            for column, values in chunk['columns'].items():
+                if isinstance(values, dict):
+                    columns[column] = [values['dictionary'][index] for index in values['indices']]
+                else:
+                    columns[column] = values
+
+            names = list(columns.keys())
+            for row in zip(*[columns[name] for name in names]):
+                yield dict(zip(names, row))
+
+    @staticmethod
+    def get_path(output_path):
+        return os.path.join(output_path, "simulation_trace.ndjson")
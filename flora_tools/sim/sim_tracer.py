@@ -1,10 +1,21 @@
 import json
 import os
+from enum import Enum
 from typing import List
 
 import flora_tools.sim.sim_network as sim_network
 from flora_tools import lwb_slot
-from flora_tools.radio_configuration import RadioConfiguration
+from flora_tools.radio_configuration import get_radio_configuration
+from flora_tools.sim.sim_trace_writer import SimTraceWriter, TRACE_CHUNK_SIZE
+
+
+class TraceEventType(Enum):
+    SYNC = 1
+    DATA_DELIVERED = 2
+    DATA_LOST = 3
+
+    def __str__(self):
+        return '{0}'.format(self.name)
 
 
 class Event:
@@ -54,9 +65,11 @@ class RxActivity(Activity):
 
 
 class CADActivity(Activity):
-    def __init__(self, start, end, node, energy, modulation, success):
-        super(CADActivity, self).__init__(type(self), start, end, node, energy=energy,
-                                          details={'modulation': modulation, 'success': success})
+    def __init__(self, start, end, node, energy, modulation, success, scan_count: int = None):
+        details = {'modulation': modulation, 'success': success}
+        if scan_count is not None:
+            details['scan_count'] = scan_count  # Idle scan steps aggregated by a fast-forwarded CAD search
+        super(CADActivity, self).__init__(type(self), start, end, node, energy=energy, details=details)
 
 
 class LWBSlotActivity(Activity):
@@ -72,27 +85,82 @@ class LWBRoundActivity(Activity):
 
 
 class SimTracer:
-    def __init__(self, network: 'sim_network.SimNetwork', output_path):
+    def __init__(self, network: 'sim_network.SimNetwork', output_path, chunk_size: int = TRACE_CHUNK_SIZE):
+        # Without an output path, everything is kept in memory. Otherwise, only the latest chunk is buffered.
         self.activities: List[Activity] = []
         self.events: List[Event] = []
         self.output_path = output_path
         self.network = network
+        self.chunk_size = chunk_size
+
+        self.activity_offset = 0  # Records traced before the network got restored from a snapshot
+        self.event_offset = 0
+        self.activity_count = 0
+        self.event_count = 0
+
+        if self.output_path is not None:
+            self.writer = SimTraceWriter(SimTraceWriter.get_path(self.output_path))
+        else:
+            self.writer = None
+
+    def restart(self, output_path):
+        # A restored network only traces the continuation, the records before stay in the snapshot's trace
+        self.output_path = output_path
+        self.activities = []
+        self.events = []
+        self.activity_offset = self.activity_count
+        self.event_offset = self.event_count
+
+        if self.output_path is not None:
+            self.writer = SimTraceWriter(SimTraceWriter.get_path(self.output_path))
+        else:
+            self.writer = None
 
     def log_activity(self, activity: Activity):
         self.activities.append(activity)
+        self.activity_count += 1
+        if self.writer is not None and len(self.activities) >= self.chunk_size:
+            self.flush_activities()
 
     def log_event(self, event: Event):
         self.events.append(event)
+        self.event_count += 1
+        if self.writer is not None and len(self.events) >= self.chunk_size:
+            self.flush_events()
+
+    def flush_activities(self):
+        self.writer.write_chunk('activities', [activity.json() for activity in self.activities])
+        self.activities = []
+
+    def flush_events(self):
+        self.writer.write_chunk('events', [event.json() for event in self.events])
+        self.events = []
+
+    def flush(self):
+        if self.writer is not None:
+            self.flush_activities()
+            self.flush_events()
+
+    def iter_activities(self):
+        if self.writer is not None:
+            yield from self.writer.read_records('activities')
+        for activity in self.activities:
+            yield activity.json()
+
+    def iter_events(self):
+        if self.writer is not None:
+            yield from self.writer.read_records('events')
+        for event in self.events:
+            yield event.json()
 
     def describe_network(self):
         edges = [[edge[0], edge[1]] for edge in self.network.G.edges]
 
         return {
             'modulations': [{'modulation': modulation, 'gloria_modulation': lwb_slot.RADIO_MODULATIONS[modulation],
-                             'color': RadioConfiguration(lwb_slot.RADIO_MODULATIONS[modulation]).color,
-                             'name': RadioConfiguration(lwb_slot.RADIO_MODULATIONS[modulation]).modulation_name} for
-                            modulation in
-                            range(len(lwb_slot.RADIO_MODULATIONS))],
+                             'color': get_radio_configuration(lwb_slot.RADIO_MODULATIONS[modulation]).color,
+                             'name': get_radio_configuration(lwb_slot.RADIO_MODULATIONS[modulation]).modulation_name}
+                            for modulation in range(len(lwb_slot.RADIO_MODULATIONS))],
             'nodes': [{'id': node.id, 'role': str(node.role)} for node in self.network.nodes],
             'edges': edges,
             'pos': self.network.pos
@@ -100,12 +168,28 @@ class SimTracer:
 
     def store(self):
         # timestr = time.strftime("%Y%m%d-%H%M%S")
+        self.flush()
 
         with open(
                 os.path.join(self.output_path, "simulation_trace.json"),  # "simulation_trace-{}.json".format(timestr)),
                 "w") as write_file:
-            json.dump({
-                'network': self.describe_network(),
-                'activities': [activity.json() for activity in self.activities],
-                'events': [event.json() for event in self.events]
-            }, write_file, indent=4)
+            # Equivalent to json.dump(..., indent=4) of the whole trace, but records are streamed from the chunks
+            write_file.write('{\n    "network": ')
+            write_file.write(SimTracer.indent_json(self.describe_network(), 4))
+            write_file.write(',\n    "activities": ')
+            SimTracer.write_json_list(write_file, self.iter_activities())
+            write_file.write(',\n    "events": ')
+            SimTracer.write_json_list(write_file, self.iter_events())
+            write_file.write('\n}')
+
+    @staticmethod
+    def indent_json(item, level: int):
+        return json.dumps(item, indent=4).replace('\n', '\n' + ' ' * level)
+
+    @staticmethod
+    def write_json_list(write_file, items):
+        empty = True
+        for item in items:
+            write_file.write(('[\n' if empty else ',\n') + ' ' * 8 + SimTracer.indent_json(item, 8))
+            empty = False
+        write_file.write('[]' if empty else '\n    ]')
@@ -0,0 +1,187 @@
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+TRANSMISSION_COLUMNS = ['transmission_id', 'source', 'source_id', 'modulation', 'band', 'power', 'tx_start', 'tx_end',
+                        'message', 'message_key']
+TRANSMISSION_DTYPES = {
+    'transmission_id': np.int64,
+    'source': object,
+    'source_id': np.int64,
+    'modulation': np.int64,
+    'band': np.int64,
+    'power': np.float64,
+    'tx_start': np.float64,
+    'tx_end': np.float64,
+    'message': object,
+    'message_key': np.int64,
+}
+
+INITIAL_CAPACITY = 64
+MIN_PRUNE_THRESHOLD = 64  # Live transmissions tolerated before the first pruning pass
+
+
+class SimTransmissionSet:
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns['tx_start'])
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def select(self, mask) -> 'SimTransmissionSet':
+        return SimTransmissionSet({column: values[mask] for column, values in self.columns.items()})
+
+    @staticmethod
+    def empty() -> 'SimTransmissionSet':
+        return SimTransmissionSet({column: np.empty(0, dtype=dtype) for column, dtype in TRANSMISSION_DTYPES.items()})
+
+    @staticmethod
+    def concatenate(sets) -> 'SimTransmissionSet':
+        sets = [item for item in sets if len(item)]
+        if not sets:
+            return SimTransmissionSet.empty()
+        elif len(sets) == 1:
+            return sets[0]
+        return SimTransmissionSet(
+            {column: np.concatenate([item.columns[column] for item in sets]) for column in TRANSMISSION_COLUMNS})
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({column: self.columns[column] for column in TRANSMISSION_COLUMNS},
+                            columns=TRANSMISSION_COLUMNS)
+
+
+class SimTransmissionGroup:
+    # Transmissions of a single (modulation, band) pair, sorted by tx_start. Together with the longest duration
+    # in the group, the start times form an interval index: everything overlapping [start, end] starts within
+    # [start - max_duration, end].
+    def __init__(self, modulation: int, band: int):
+        self.modulation = modulation
+        self.band = band
+        self.size = 0
+        self.max_duration = 0.0
+        self.columns = {column: np.empty(INITIAL_CAPACITY, dtype=TRANSMISSION_DTYPES[column])
+                        for column in TRANSMISSION_COLUMNS}
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, transmission_id, source, power, tx_start, tx_end, message, message_key):
+        if self.size == len(self.columns['tx_start']):
+            for column, values in self.columns.items():
+                grown = np.empty(2 * len(values), dtype=values.dtype)
+                grown[:self.size] = values[:self.size]
+                self.columns[column] = grown
+
+        index = int(np.searchsorted(self.columns['tx_start'][:self.size], tx_start, side='right'))
+        row = {'transmission_id': transmission_id, 'source': source, 'source_id': source.id,
+               'modulation': self.modulation, 'band': self.band, 'power': power, 'tx_start': tx_start,
+               'tx_end': tx_end, 'message': message, 'message_key': message_key}
+
+        for column, values in self.columns.items():
+            if index < self.size:
+                values[index + 1:self.size + 1] = values[index:self.size]
+            values[index] = row[column]
+
+        self.size += 1
+        self.max_duration = max(self.max_duration, tx_end - tx_start)
+
+    def rows(self, lower: int, upper: int, mask=None) -> SimTransmissionSet:
+        columns = {column: values[lower:upper] for column, values in self.columns.items()}
+        if mask is not None:
+            columns = {column: values[mask] for column, values in columns.items()}
+        else:
+            columns = {column: values.copy() for column, values in columns.items()}
+        return SimTransmissionSet(columns)
+
+    def overlapping(self, start: float, end: float, closed=True) -> SimTransmissionSet:
+        starts = self.columns['tx_start'][:self.size]
+        lower = int(np.searchsorted(starts, start - self.max_duration, side='left'))
+        upper = int(np.searchsorted(starts, end, side=('right' if closed else 'left')))
+
+        ends = self.columns['tx_end'][lower:upper]
+        return self.rows(lower, upper, (ends >= start) if closed else (ends > start))
+
+    def starting_between(self, start: float, end: float, ending_after: float = None) -> SimTransmissionSet:
+        starts = self.columns['tx_start'][:self.size]
+        lower = int(np.searchsorted(starts, start, side='left'))
+        upper = int(np.searchsorted(starts, end, side='right'))
+
+        if ending_after is None:
+            return self.rows(lower, upper)
+        else:
+            return self.rows(lower, upper, self.columns['tx_end'][lower:upper] > ending_after)
+
+    def starting_after(self, timestamp: float) -> SimTransmissionSet:
+        starts = self.columns['tx_start'][:self.size]
+        return self.rows(int(np.searchsorted(starts, timestamp, side='right')), self.size)
+
+    def prune(self, horizon: float):
+        keep = self.columns['tx_end'][:self.size] >= horizon
+        if not keep.all():
+            count = int(np.count_nonzero(keep))
+            for values in self.columns.values():
+                values[:count] = values[:self.size][keep]
+                if values.dtype == object:
+                    values[count:self.size] = None  # Release the message references
+
+            self.size = count
+            ends = self.columns['tx_end'][:self.size]
+            starts = self.columns['tx_start'][:self.size]
+            self.max_duration = float(np.max(ends - starts)) if self.size else 0.0
+
+
+class SimTransmissionStore:
+    def __init__(self):
+        self.groups: Dict[Tuple[int, int], SimTransmissionGroup] = {}
+        self.prune_threshold = MIN_PRUNE_THRESHOLD
+        self.total_count = 0
+
+    def __len__(self):
+        return sum(len(group) for group in self.groups.values())
+
+    @property
+    def needs_pruning(self):
+        return len(self) > self.prune_threshold
+
+    def append(self, source, modulation: int, band: int, power: float, tx_start: float, tx_end: float, message,
+               message_key):
+        group = self.groups.get((modulation, band))
+        if group is None:
+            group = SimTransmissionGroup(modulation, band)
+            self.groups[(modulation, band)] = group
+
+        group.insert(self.total_count, source, power, tx_start, tx_end, message, message_key)
+        self.total_count += 1
+
+    def prune(self, horizon: float):
+        for group in self.groups.values():
+            group.prune(horizon)
+
+        self.prune_threshold = max(MIN_PRUNE_THRESHOLD, 2 * len(self))
+
+    def get_groups(self, modulation: int = None, band: int = None):
+        return [group for (group_modulation, group_band), group in self.groups.items()
+                if (modulation is None or group_modulation == modulation) and (band is None or group_band == band)]
+
+    def overlapping(self, start: float, end: float, modulation: int = None, band: int = None,
+                    closed=True) -> SimTransmissionSet:
+        return SimTransmissionSet.concatenate(
+            [group.overlapping(start, end, closed=closed) for group in self.get_groups(modulation, band)])
+
+    def starting_between(self, start: float, end: float, modulation: int = None, band: int = None,
+                         ending_after: float = None) -> SimTransmissionSet:
+        return SimTransmissionSet.concatenate(
+            [group.starting_between(start, end, ending_after=ending_after)
+             for group in self.get_groups(modulation, band)])
+
+    def starting_after(self, timestamp: float, modulation: int = None, band: int = None) -> SimTransmissionSet:
+        return SimTransmissionSet.concatenate(
+            [group.starting_after(timestamp) for group in self.get_groups(modulation, band)])
+
+    def to_frame(self) -> pd.DataFrame:
+        return SimTransmissionSet.concatenate(
+            [group.rows(0, group.size) for group in self.groups.values()]).to_frame()